@@ -55,29 +55,27 @@ async def main():
     print(f"Agent: {response}")
     print()
 
-    # Example 3: Get recommendation with preference applied
-    print("=" * 70)
-    print("Example 3: Tokyo, Japan (with preference)")
-    print("=" * 70)
-    recommendation = await agent.get_recommendation("Tokyo")
-    print(recommendation)
-    print()
-
-    # Example 4: Different weather conditions
-    print("=" * 70)
-    print("Example 4: London, UK (typically rainy)")
-    print("=" * 70)
-    recommendation = await agent.get_recommendation("London")
-    print(recommendation)
-    print()
+    # Examples 3-5 are independent of each other, so fetch them concurrently
+    examples = [
+        ("Example 3: Tokyo, Japan (with preference)", "Tokyo", "metric"),
+        ("Example 4: London, UK (typically rainy)", "London", "metric"),
+        ("Example 5: New York, USA (Fahrenheit)", "New York", "imperial"),
+    ]
+    recommendations = await asyncio.gather(
+        *(agent.get_recommendation(city, temperature_unit=unit)
+          for _, city, unit in examples),
+        return_exceptions=True
+    )
 
-    # Example 5: Using Fahrenheit
-    print("=" * 70)
-    print("Example 5: New York, USA (Fahrenheit)")
-    print("=" * 70)
-    recommendation = await agent.get_recommendation("New York", temperature_unit="imperial")
-    print(recommendation)
-    print()
+    for (title, _, _), recommendation in zip(examples, recommendations):
+        print("=" * 70)
+        print(title)
+        print("=" * 70)
+        if isinstance(recommendation, Exception):
+            print(f"❌ Error: {recommendation}")
+        else:
+            print(recommendation)
+        print()
 
     print("=" * 70)
     print("✅ Examples completed!")
@@ -107,10 +107,18 @@ async def main():
     print("=" * 70)
     cities = ["Tokyo", "London", "Sydney"]
 
-    for city in cities:
-        logger.info(f"Processing request for {city}")
+    # Requests are independent, so issue them concurrently
+    logger.info(f"Processing requests for {', '.join(cities)}")
+    results = await asyncio.gather(
+        *[get_recommendation_with_logging(agent, city) for city in cities],
+        return_exceptions=True
+    )
+
+    for city, recommendation in zip(cities, results):
         print(f"\n--- {city} ---")
-        recommendation = await get_recommendation_with_logging(agent, city)
+        if isinstance(recommendation, Exception):
+            print(f"❌ Error: {recommendation}")
+            continue
         print(recommendation[:200] + "..." if len(recommendation) > 200 else recommendation)
 
     print()
@@ -4,8 +4,6 @@ Create a new Agent Engine with Memory Bank enabled.
 Run this script once to create the Agent Engine, then copy the ID to your .env file.
 """
 
-import vertexai
-
 # Configuration
 PROJECT_ID = "pure-stronghold-477813-j2"  # Your project ID
 LOCATION = "asia-southeast1"  # Your region
@@ -18,6 +16,9 @@ def create_agent_engine():
     print(f"Project: {PROJECT_ID}")
     print(f"Location: {LOCATION}\n")
 
+    # Imported here so the heavy SDK only loads when actually creating an engine
+    import vertexai
+
     # Initialize Vertex AI client
     client = vertexai.Client(
         project=PROJECT_ID,
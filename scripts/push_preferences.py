@@ -4,11 +4,17 @@ Push local preferences to Vertex AI Memory Bank (one-way sync).
 
 This script ONLY pushes your local preferences to Memory Bank.
 It does NOT load from Memory Bank first, avoiding overwrites.
+
+Preferences already pushed to the configured Agent Engine are skipped;
+pass --force to push everything again.
 """
 
+import argparse
 import asyncio
+import functools
+import hashlib
 import sys
-import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path
@@ -16,51 +22,114 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from config import Config
 from agents.activity_agent import CalendarConnector
+from utils.json_compat import _json_loads
+from utils.vertex_client import get_vertex_client, get_agent_engine_name
+
+# Maximum number of Memory Bank requests in flight at once
+MAX_CONCURRENT_PUSHES = 8
+
+# Dedicated worker threads for the blocking Memory Bank SDK calls
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PUSHES)
+
+# Hashes of (agent engine, user_id, preference) triples already pushed, one per line
+PUSHED_CACHE_FILE = Path("data/.pushed_preferences.sha256")
+
 
-# Vertex AI imports
-import vertexai
+def preference_hash(agent_engine_name, user_id, preference_value):
+    """Hash an (agent engine, user_id, preference) triple for the pushed-preferences cache."""
+    key = f"{agent_engine_name}:{user_id}:{preference_value}"
+    return hashlib.sha256(key.encode()).hexdigest()
 
 
-async def push_preference(client, agent_engine_name, user_id, preference_value):
+def load_pushed_hashes():
+    """Load hashes of previously pushed preferences."""
+    try:
+        return set(PUSHED_CACHE_FILE.read_text().split())
+    except OSError:
+        return set()
+
+
+def record_pushed_hash(pushed, pref_hash):
+    """Remember a pushed preference (append-only, so partial runs are kept)."""
+    pushed.add(pref_hash)
+    with open(PUSHED_CACHE_FILE, 'a') as f:
+        f.write(pref_hash + "\n")
+
+
+async def push_preference(client, agent_engine_name, user_id, preference_value, sem, pushed):
     """Push a single preference to Memory Bank."""
     # Skip generic preferences
     if "remember my clothing preferences" in preference_value.lower():
         print(f"   ⏭️  Skipping: {preference_value}")
         return
 
-    print(f"   💾 Saving: {preference_value}")
-
-    # Create conversation for this specific preference
-    user_message = f"Please remember this about my clothing preferences: {preference_value}"
-    assistant_message = f"Got it! I'll remember that you {preference_value}. I'll use this when making outfit recommendations."
+    # Skip preferences Memory Bank already has
+    pref_hash = preference_hash(agent_engine_name, user_id, preference_value)
+    if pref_hash in pushed:
+        print(f"   ⏭️  Already pushed: {preference_value}")
+        return
 
-    # Generate memory
-    events = [
-        {
-            "content": {
-                "role": "user",
-                "parts": [{"text": user_message}]
-            }
-        },
-        {
-            "content": {
-                "role": "model",
-                "parts": [{"text": assistant_message}]
+    async with sem:
+        print(f"   💾 Saving: {preference_value}")
+
+        # Create conversation for this specific preference
+        user_message = f"Please remember this about my clothing preferences: {preference_value}"
+        assistant_message = f"Got it! I'll remember that you {preference_value}. I'll use this when making outfit recommendations."
+
+        # Generate memory
+        events = [
+            {
+                "content": {
+                    "role": "user",
+                    "parts": [{"text": user_message}]
+                }
+            },
+            {
+                "content": {
+                    "role": "model",
+                    "parts": [{"text": assistant_message}]
+                }
             }
-        }
-    ]
-
-    result = client.agent_engines.memories.generate(
-        name=agent_engine_name,
-        direct_contents_source={"events": events},
-        scope={"user_id": user_id},
-        config={"wait_for_completion": True}
+        ]
+
+        # The SDK call is blocking; run it on the worker pool so pushes overlap
+        await asyncio.get_running_loop().run_in_executor(
+            _EXECUTOR,
+            functools.partial(
+                client.agent_engines.memories.generate,
+                name=agent_engine_name,
+                direct_contents_source={"events": events},
+                scope={"user_id": user_id},
+                config={"wait_for_completion": True}
+            )
+        )
+
+        record_pushed_hash(pushed, pref_hash)
+        print(f"      ✅ Saved successfully")
+
+
+async def authenticate_user(calendar_connector):
+    """Resolve the user ID, using the cached identity when possible."""
+    user_email = calendar_connector.get_user_id_cached()
+    if not user_email:
+        if not await calendar_connector.authenticate_async():
+            return None
+        user_email = calendar_connector.get_user_email()
+
+    return user_email if user_email else "default_user"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Push local preferences to Memory Bank")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="push every preference, ignoring the already-pushed cache"
     )
-
-    print(f"      ✅ Saved successfully")
+    return parser.parse_args()
 
 
-async def main():
+async def main(force=False):
     print("\n" + "=" * 70)
     print("📤 Push Local Preferences to Memory Bank")
     print("=" * 70)
@@ -72,38 +141,50 @@ async def main():
     # Authenticate to get user ID
     print("\n🔐 Authenticating...")
     calendar_connector = CalendarConnector()
-    if not calendar_connector.authenticate():
+
+    # Initialize Vertex AI client while authentication is in progress
+    user_id, client = await asyncio.gather(
+        authenticate_user(calendar_connector),
+        asyncio.to_thread(
+            get_vertex_client, Config.GOOGLE_CLOUD_PROJECT, Config.GOOGLE_CLOUD_LOCATION
+        )
+    )
+    if not user_id:
         print("❌ Failed to authenticate")
         return
 
-    user_email = calendar_connector.get_user_email()
-    user_id = user_email if user_email else "default_user"
     print(f"✅ Authenticated as: {user_id}\n")
 
-    # Initialize Vertex AI client
-    client = vertexai.Client(
-        project=Config.GOOGLE_CLOUD_PROJECT,
-        location=Config.GOOGLE_CLOUD_LOCATION
+    agent_engine_name = get_agent_engine_name(
+        Config.GOOGLE_CLOUD_PROJECT,
+        Config.GOOGLE_CLOUD_LOCATION,
+        Config.AGENT_ENGINE_ID
     )
 
-    agent_engine_name = f"projects/{Config.GOOGLE_CLOUD_PROJECT}/locations/{Config.GOOGLE_CLOUD_LOCATION}/reasoningEngines/{Config.AGENT_ENGINE_ID}"
-
     # Load local preferences
     prefs_file = Path("data/preferences.json")
     if not prefs_file.exists():
         print("❌ No local preferences file found")
         return
 
-    with open(prefs_file) as f:
-        local_prefs = json.load(f)
+    local_prefs = _json_loads(prefs_file.read_bytes())
 
     print(f"📋 Found {len(local_prefs)} local preferences to push:\n")
-    for key, value in local_prefs.items():
-        await push_preference(client, agent_engine_name, user_id, value)
+    sem = asyncio.Semaphore(MAX_CONCURRENT_PUSHES)
+    pushed = set() if force else load_pushed_hashes()
+    tasks = [
+        push_preference(client, agent_engine_name, user_id, value, sem, pushed)
+        for value in local_prefs.values()
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"   ⚠️  Failed to save preference: {result}")
 
     print("\n✅ Push complete!")
     print("=" * 70 + "\n")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(force=parse_args().force))
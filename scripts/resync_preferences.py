@@ -17,24 +17,35 @@ from config import Config
 from agents.preference_agent import PreferenceManager
 from agents.activity_agent import CalendarConnector
 
+# Maximum number of Memory Bank requests in flight at once
+MAX_CONCURRENT_SAVES = 8
 
-async def main():
+
+async def main() -> int:
+    """
+    Re-sync preferences.
+
+    Returns:
+        Process exit status: 0 if every preference was re-saved, 1 otherwise
+    """
     print("\n" + "=" * 70)
     print("🔄 Re-syncing Preferences to Memory Bank")
     print("=" * 70)
 
     # Validate configuration
     if not Config.validate():
-        return
+        return 1
 
     # Authenticate to get user ID
     print("\n🔐 Authenticating...")
     calendar_connector = CalendarConnector()
-    if not calendar_connector.authenticate():
-        print("❌ Failed to authenticate")
-        return
+    user_email = calendar_connector.get_user_id_cached()
+    if not user_email:
+        if not await calendar_connector.authenticate_async():
+            print("❌ Failed to authenticate")
+            return 1
+        user_email = calendar_connector.get_user_email()
 
-    user_email = calendar_connector.get_user_email()
     user_id = user_email if user_email else "default_user"
     print(f"✅ Authenticated as: {user_id}\n")
 
@@ -57,12 +68,36 @@ async def main():
 
     # Re-save each preference to Memory Bank
     print(f"\n💾 Re-saving to Memory Bank...")
-    for key, value in local_prefs.items():
-        await pref_manager._save_to_memory_bank(key, value)
+    sem = asyncio.Semaphore(MAX_CONCURRENT_SAVES)
+
+    async def resave(key, value):
+        async with sem:
+            return await pref_manager._save_to_memory_bank(key, value)
+
+    results = await asyncio.gather(
+        *(resave(key, value) for key, value in local_prefs.items()),
+        return_exceptions=True
+    )
+
+    failed = 0
+    for key, result in zip(local_prefs, results):
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"   ⚠️  Failed to re-save {key}: {result}")
+        elif not result:
+            # Memory Bank error, already reported by the preference manager
+            failed += 1
+            print(f"   ⚠️  Failed to re-save {key}")
+
+    if failed:
+        print(f"\n❌ Re-sync finished with {failed} of {len(results)} preferences failed")
+        print("=" * 70 + "\n")
+        return 1
 
     print("\n✅ Re-sync complete!")
     print("=" * 70 + "\n")
+    return 0
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
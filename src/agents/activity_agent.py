@@ -5,17 +5,72 @@ Connects to Google Calendar to fetch today's events and analyze activity types.
 Helps recommend outfits based on scheduled activities.
 """
 
+import asyncio
+import functools
+import json
 import os
 import pickle
+import re
+import tempfile
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
-
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from types import SimpleNamespace
+
+try:
+    from ..utils.json_compat import _json_loads
+except ImportError:  # agents loaded as a top-level package (src/ on sys.path)
+    from utils.json_compat import _json_loads
+
+
+@functools.lru_cache(maxsize=None)
+def _google_modules() -> SimpleNamespace:
+    """
+    Import the Google auth and API client libraries on first use.
+
+    These pull in a large dependency tree, so they are only loaded once a
+    CalendarConnector actually needs them.
+    """
+    from google.auth import jwt
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+
+    return SimpleNamespace(
+        jwt=jwt,
+        Request=Request,
+        Credentials=Credentials,
+        InstalledAppFlow=InstalledAppFlow,
+        build=build,
+        HttpError=HttpError,
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class CalendarEvent:
+    """A calendar event, reduced to the fields used for outfit decisions."""
+
+    summary: str
+    location: str
+    start: str
+    end: str
+
+
+def _today_bounds_iso() -> Tuple[str, str]:
+    """
+    Get the start and end of the local day as RFC 3339 timestamps.
+
+    Returns:
+        Tuple of (start_of_day, end_of_day) including the local UTC offset
+    """
+    start_of_day = datetime.now().astimezone().replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    end_of_day = start_of_day + timedelta(days=1)
+    return start_of_day.isoformat(), end_of_day.isoformat()
 
 
 class CalendarConnector:
@@ -38,6 +93,8 @@ class CalendarConnector:
         """
         self.credentials_path = credentials_path
         self.token_path = token_path
+        # Cached user identity, kept next to the token it was derived from
+        self.user_cache_path = str(Path(token_path).with_name('.wib_user.json'))
         self.service = None
         self.credentials = None
         self.user_email = None
@@ -53,71 +110,178 @@ class CalendarConnector:
             First run will open browser for authorization.
             Token is saved to token.json for subsequent runs.
         """
+        google = _google_modules()
         creds = None
 
         # Load existing token if available
         if os.path.exists(self.token_path):
-            creds = Credentials.from_authorized_user_file(self.token_path, self.SCOPES)
+            creds = google.Credentials.from_authorized_user_file(self.token_path, self.SCOPES)
 
         # If no valid credentials, get new ones
-        if not creds or not creds.valid:
+        token_changed = not creds or not creds.valid
+        if token_changed:
             if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
+                creds.refresh(google.Request())
             else:
                 if not os.path.exists(self.credentials_path):
                     return False
 
-                flow = InstalledAppFlow.from_client_secrets_file(
+                flow = google.InstalledAppFlow.from_client_secrets_file(
                     self.credentials_path, self.SCOPES
                 )
                 creds = flow.run_local_server(port=0)
 
-            # Save credentials for next run
-            with open(self.token_path, 'w') as token:
-                token.write(creds.to_json())
-
         try:
-            self.service = build('calendar', 'v3', credentials=creds)
+            if token_changed:
+                # Save credentials for next run
+                self._save_token(creds)
+
+            # Use the discovery document bundled with the client library
+            # instead of fetching it over HTTPS
+            self.service = google.build('calendar', 'v3', credentials=creds,
+                                 static_discovery=True)
             self.credentials = creds
 
             # Get user email from token info
             self._extract_user_email()
+            self._save_user_cache()
 
             return True
         except Exception:
             return False
 
+    def _save_token(self, creds):
+        """
+        Write credentials to token_path.
+
+        Writes to a uniquely named temporary file next to the token and
+        renames it over the token, so neither a crash nor a concurrent save
+        leaves a half-written token behind. The temporary file is removed if
+        the write fails.
+        """
+        token_dir = os.path.dirname(os.path.abspath(self.token_path))
+        token = tempfile.NamedTemporaryFile(
+            'w', dir=token_dir, prefix='.token-', suffix='.tmp', delete=False
+        )
+        try:
+            with token:
+                token.write(creds.to_json())
+            os.replace(token.name, self.token_path)
+        except OSError:
+            try:
+                os.remove(token.name)
+            except OSError:
+                pass
+            raise
+
+    async def authenticate_async(self) -> bool:
+        """
+        Authenticate without blocking the event loop.
+
+        Runs authenticate() (OAuth flow, token refresh, service build) in a
+        worker thread so other startup work can proceed concurrently.
+
+        Returns:
+            bool: True if authentication successful
+        """
+        return await asyncio.to_thread(self.authenticate)
+
+    def get_user_id_cached(self) -> Optional[str]:
+        """
+        Get the user's email without a full authentication round-trip.
+
+        Uses the identity cached by the last successful authenticate(), as
+        long as token.json has not changed since and its credentials are
+        still valid. Does not build the Calendar service.
+
+        Returns:
+            Cached email address, or None if authenticate() is required
+        """
+        try:
+            with open(self.user_cache_path, 'rb') as f:
+                cached = _json_loads(f.read())
+
+            if cached.get('token_mtime') != os.path.getmtime(self.token_path):
+                return None
+
+            creds = _google_modules().Credentials.from_authorized_user_file(
+                self.token_path, self.SCOPES
+            )
+            if not creds.valid:
+                return None
+        except (OSError, ValueError):
+            return None
+
+        self.user_email = cached.get('email')
+        return self.user_email
+
+    def _save_user_cache(self):
+        """Cache the authenticated email for get_user_id_cached()."""
+        if not self.user_email:
+            return
+
+        try:
+            with open(self.user_cache_path, 'w') as f:
+                json.dump({
+                    'email': self.user_email,
+                    'token_mtime': os.path.getmtime(self.token_path)
+                }, f)
+        except OSError:
+            pass
+
+    def _email_from_id_token(self) -> Optional[str]:
+        """
+        Read the email claim from the cached OpenID Connect ID token.
+
+        Returns:
+            Email address, or None if no ID token or claim is available
+        """
+        id_token = getattr(self.credentials, 'id_token', None)
+        if not id_token:
+            return None
+
+        try:
+            # The token came straight from Google's token endpoint over TLS,
+            # so skip signature verification (it would need a cert download)
+            claims = _google_modules().jwt.decode(id_token, verify=False)
+        except ValueError:
+            return None
+
+        return claims.get('email')
+
     def _extract_user_email(self):
         """Extract user email from OAuth token."""
         try:
-            import json
-            if os.path.exists(self.token_path):
-                with open(self.token_path, 'r') as f:
-                    token_data = json.load(f)
-                    # Try to get email from token data
-                    # The email might be in client_id or we need to fetch it
-                    if self.credentials:
-                        # Use OAuth2 API to get user info
-                        import requests
-                        headers = {'Authorization': f'Bearer {self.credentials.token}'}
-                        response = requests.get(
-                            'https://www.googleapis.com/oauth2/v2/userinfo',
-                            headers=headers
-                        )
-                        if response.status_code == 200:
-                            user_info = response.json()
-                            self.user_email = user_info.get('email')
-                            if self.user_email:
-                                print(f"\n👤 Authenticated as: {self.user_email}\n")
-                            else:
-                                print(f"\n⚠️  Email not found in user info response")
-                                print(f"   Response: {user_info}")
-                                print("   Using default user ID\n")
-                        else:
-                            print(f"\n⚠️  OAuth API returned status {response.status_code}")
-                            print(f"   Response: {response.text[:200]}")
-                            print("   Using default user ID\n")
-                            self.user_email = None
+            # The 'openid' scope means the ID token usually carries the email,
+            # which avoids a round-trip to the userinfo endpoint
+            email = self._email_from_id_token()
+            if email:
+                self.user_email = email
+                print(f"\n👤 Authenticated as: {self.user_email}\n")
+                return
+
+            if self.credentials:
+                # Use OAuth2 API to get user info
+                import requests
+                headers = {'Authorization': f'Bearer {self.credentials.token}'}
+                response = requests.get(
+                    'https://www.googleapis.com/oauth2/v2/userinfo',
+                    headers=headers
+                )
+                if response.status_code == 200:
+                    user_info = response.json()
+                    self.user_email = user_info.get('email')
+                    if self.user_email:
+                        print(f"\n👤 Authenticated as: {self.user_email}\n")
+                    else:
+                        print(f"\n⚠️  Email not found in user info response")
+                        print(f"   Response: {user_info}")
+                        print("   Using default user ID\n")
+                else:
+                    print(f"\n⚠️  OAuth API returned status {response.status_code}")
+                    print(f"   Response: {response.text[:200]}")
+                    print("   Using default user ID\n")
+                    self.user_email = None
         except Exception as e:
             # Fallback to default if we can't get email
             self.user_email = None
@@ -133,56 +297,137 @@ class CalendarConnector:
         """
         return self.user_email
 
-    def get_todays_events(self) -> List[Dict[str, Any]]:
+    def get_todays_events(self) -> List[CalendarEvent]:
         """
         Fetch today's calendar events.
 
         Returns:
-            List of event dictionaries with time, summary, location
+            List of CalendarEvent objects with time, summary, location
         """
         if not self.service:
             return []
 
         try:
-            # Get start and end of today
-            now = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            end_of_day = now + timedelta(days=1)
+            start_of_day, end_of_day = _today_bounds_iso()
 
             events_result = self.service.events().list(
                 calendarId='primary',
-                timeMin=now.isoformat() + 'Z',
-                timeMax=end_of_day.isoformat() + 'Z',
+                timeMin=start_of_day,
+                timeMax=end_of_day,
                 singleEvents=True,
                 orderBy='startTime'
             ).execute()
 
-            events = events_result.get('items', [])
-
-            formatted_events = []
-            for event in events:
-                formatted_events.append({
-                    'summary': event.get('summary', 'Untitled Event'),
-                    'location': event.get('location', ''),
-                    'start': event['start'].get('dateTime', event['start'].get('date')),
-                    'end': event['end'].get('dateTime', event['end'].get('date')),
-                })
+            formatted_events = [
+                CalendarEvent(
+                    summary=event.get('summary', 'Untitled Event'),
+                    location=event.get('location', ''),
+                    start=event['start'].get('dateTime') or event['start'].get('date'),
+                    end=event['end'].get('dateTime') or event['end'].get('date'),
+                )
+                for event in events_result.get('items', [])
+            ]
 
             return formatted_events
 
-        except HttpError:
+        except _google_modules().HttpError:
             return []
 
+    async def get_todays_events_async(self) -> List[CalendarEvent]:
+        """
+        Fetch today's calendar events without blocking the event loop.
+
+        The Google API client is synchronous, so the request runs in a worker
+        thread and can overlap with other async I/O (weather, Memory Bank).
+
+        Returns:
+            List of CalendarEvent objects with time, summary, location
+        """
+        return await asyncio.to_thread(self.get_todays_events)
+
+
+# Keyword groups used to classify calendar events
+OUTDOOR_LOCATION_KEYWORDS = frozenset({'park', 'outdoor', 'trail', 'beach'})
+OFFICE_LOCATION_KEYWORDS = frozenset({'office', 'workplace'})
+HOME_LOCATION_KEYWORDS = frozenset({'home', 'house'})
+FORMAL_KEYWORDS = frozenset({'meeting', 'presentation', 'interview', 'client'})
+# Compounds the old substring match caught that no suffix rule reaches
+BUSINESS_KEYWORDS = frozenset({'work', 'office', 'business', 'workshop', 'networking', 'coworking'})
+EXERCISE_KEYWORDS = frozenset({'gym', 'workout', 'run', 'running', 'runner', 'exercise', 'yoga', 'fitness'})
+OUTDOOR_SUMMARY_KEYWORDS = frozenset({'outdoor', 'outside', 'park', 'hike'})
+
+
+# Category bit flags reported by the keyword scanners
+OUTDOOR = 1
+OFFICE = 2
+HOME = 4
+FORMAL = 8
+BUSINESS = 16
+EXERCISE = 32
+
+
+# Word endings accepted after a keyword
+PLURAL_SUFFIX = r's?'
+INFLECTION_SUFFIX = r'(?:s|es|ing|ed|er|ers)?'
+
+
+def _build_scanner(groups: Dict[int, frozenset],
+                   suffix: str = PLURAL_SUFFIX) -> Tuple[re.Pattern, Dict[str, int]]:
+    """
+    Build a single-pass scanner over several keyword groups.
+
+    Args:
+        groups: Mapping of category flag to the keywords that set it
+        suffix: Regex for the word endings allowed after a keyword
+
+    Returns:
+        Tuple of (whole-word regex matching any keyword plus suffix;
+        mapping of keyword to the OR of its category flags)
+    """
+    flags: Dict[str, int] = {}
+    for flag, keywords in groups.items():
+        for keyword in keywords:
+            flags[keyword] = flags.get(keyword, 0) | flag
+
+    # Longest first, so e.g. 'workout' wins over 'work' at the same position
+    alternation = '|'.join(re.escape(k) for k in sorted(flags, key=lambda k: (-len(k), k)))
+    return re.compile(rf'\b({alternation}){suffix}\b'), flags
+
+
+def _scan(scanner: Tuple[re.Pattern, Dict[str, int]], text: str) -> int:
+    """Scan text once and return the OR of all matched category flags."""
+    pattern, flags = scanner
+    result = 0
+    for match in pattern.finditer(text):
+        result |= flags[match.group(1)]
+    return result
+
+
+_LOCATION_SCANNER = _build_scanner({
+    OUTDOOR: OUTDOOR_LOCATION_KEYWORDS,
+    OFFICE: OFFICE_LOCATION_KEYWORDS,
+    HOME: HOME_LOCATION_KEYWORDS,
+})
+# Summaries are free text ('Running club', 'Client meetings'), so accept
+# inflected forms. Locations stay plural-only so 'parking' is not outdoor.
+_SUMMARY_SCANNER = _build_scanner({
+    FORMAL: FORMAL_KEYWORDS,
+    BUSINESS: BUSINESS_KEYWORDS,
+    EXERCISE: EXERCISE_KEYWORDS,
+    OUTDOOR: OUTDOOR_SUMMARY_KEYWORDS,
+}, suffix=INFLECTION_SUFFIX)
+
 
 class ActivityDetector:
     """Analyzes calendar events to determine activity types and outfit requirements."""
 
     @staticmethod
-    def analyze_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_event(event: Union[CalendarEvent, Dict[str, Any]]) -> Dict[str, Any]:
         """
         Analyze a calendar event to determine activity characteristics.
 
         Args:
-            event: Event dictionary from calendar
+            event: CalendarEvent from CalendarConnector, or an event dictionary
 
         Returns:
             Dictionary with activity analysis including:
@@ -198,39 +443,64 @@ class ActivityDetector:
             >>> print(analysis['formality'])
             'formal'
         """
-        summary = event.get('summary', '').lower()
-        location = event.get('location', '').lower()
+        if isinstance(event, CalendarEvent):
+            title, start_time, raw_location = event.summary, event.start, event.location
+        else:
+            title = event.get('summary', 'Event')
+            start_time = event.get('start', '')
+            raw_location = event.get('location', '')
+
+        summary = title.lower()
+        location = raw_location.lower()
+
+        # One pass over each string collects every matching category
+        location_flags = _scan(_LOCATION_SCANNER, location)
+        summary_flags = _scan(_SUMMARY_SCANNER, summary)
 
         # Determine location type
         location_type = 'indoor'
-        if any(word in location for word in ['park', 'outdoor', 'trail', 'beach']):
+        if location_flags & OUTDOOR:
             location_type = 'outdoor'
-        elif any(word in location for word in ['office', 'workplace']):
+        elif location_flags & OFFICE:
             location_type = 'office'
-        elif any(word in location for word in ['home', 'house']):
+        elif location_flags & HOME:
             location_type = 'home'
 
         # Determine formality
         formality = 'casual'
-        if any(word in summary for word in ['meeting', 'presentation', 'interview', 'client']):
+        if summary_flags & FORMAL:
             formality = 'formal'
-        elif any(word in summary for word in ['work', 'office', 'business']):
+        elif summary_flags & BUSINESS:
             formality = 'business_casual'
 
         # Check for exercise
-        is_exercise = any(word in summary for word in 
-                         ['gym', 'workout', 'run', 'exercise', 'yoga', 'fitness'])
+        is_exercise = bool(summary_flags & EXERCISE)
 
         # Check for outdoor
-        is_outdoor = location_type == 'outdoor' or \
-                    any(word in summary for word in ['outdoor', 'outside', 'park', 'hike'])
+        is_outdoor = location_type == 'outdoor' or bool(summary_flags & OUTDOOR)
 
         return {
-            'title': event.get('summary', 'Event'),
-            'start_time': event.get('start', ''),
-            'raw_location': event.get('location', ''),
+            'title': title,
+            'start_time': start_time,
+            'raw_location': raw_location,
             'location_type': location_type,
             'formality': formality,
             'is_exercise': is_exercise,
             'is_outdoor': is_outdoor
         }
+
+    @classmethod
+    def analyze_events_batch(
+        cls, events: List[Union[CalendarEvent, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze a list of calendar events.
+
+        Args:
+            events: CalendarEvent objects or event dictionaries
+
+        Returns:
+            List of activity analyses, in the same order as events
+        """
+        analyze = cls.analyze_event
+        return [analyze(event) for event in events]
@@ -5,12 +5,42 @@ Stores and retrieves user preferences for outfit recommendations using
 Vertex AI Memory Bank for persistent cloud storage.
 """
 
+import asyncio
 import json
 import os
-from typing import Dict, Any, List, Optional
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
+try:
+    from ..utils.json_compat import _json_dumps, _json_loads
+    from ..utils.vertex_client import get_vertex_client, get_agent_engine_name
+except ImportError:  # agents loaded as a top-level package (src/ on sys.path)
+    from utils.json_compat import _json_dumps, _json_loads
+    from utils.vertex_client import get_vertex_client, get_agent_engine_name
+
+# Optional streaming parser for large preference files
+try:
+    import ijson
+    _JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
+# Files above this size are streamed with ijson (when installed)
+STREAMING_LOAD_THRESHOLD = 256_000
+
+# Seconds to wait for more changes before writing the preferences file
+FILE_SAVE_DELAY = 0.5
+
+# Memory Bank facts containing any of these words are loaded as preferences
+_PREF_KEYWORDS_RE = re.compile(r'prefer|style|casual|formal')
+
+
 # Vertex AI Memory imports
 try:
     from google.adk.memory import VertexAiMemoryBankService
@@ -23,6 +53,12 @@ except (ImportError, AttributeError) as e:
     Session = None
 
 
+def _print_banner(title: str, *lines: str):
+    """Print a framed status banner with a single write to stdout."""
+    rule = "=" * 70
+    print("\n".join(("", rule, title, rule, *lines, rule, "")))
+
+
 class PreferenceManager:
     """
     Manages user preferences for outfit recommendations.
@@ -57,53 +93,55 @@ class PreferenceManager:
         self.app_name = "weatheritbetter"
 
         # File-based storage (always used as backup)
+        self._last_payload_hash = None
+        self._save_timer = None  # Pending debounced file save
+        self._save_lock = threading.Lock()
         self.preferences = self._load_preferences_from_file()
+        self._prefs_view = MappingProxyType(self.preferences)  # Read-only, always current
+        self._pref_values: List[str] = list(self.preferences.values())  # Kept in dict order
 
         # Vertex AI Memory Bank setup
         self.use_vertex_ai = use_vertex_ai and VERTEX_AI_AVAILABLE
         self.memory_service = None
+        self._vertex_client = None
+        self._agent_engine_name = None
         self.preferences_loaded_from = "local_file"  # Track source
+        self._bg_executor = None  # Created on first background Memory Bank save
+        # Queued for the next Memory Bank flush, each with a future for its outcome
+        self._pending_prefs: List[Tuple[str, Future]] = []
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
 
         if self.use_vertex_ai:
             if not all([project_id, location, agent_engine_id]):
-                print("\n" + "=" * 70)
-                print("⚠️  VERTEX AI CREDENTIALS INCOMPLETE")
-                print("=" * 70)
-                print("   Using file-based preference storage")
-                print(f"   Storage location: {self.storage_path}")
-                print("=" * 70 + "\n")
+                _print_banner(
+                    "⚠️  VERTEX AI CREDENTIALS INCOMPLETE",
+                    "   Using file-based preference storage",
+                    f"   Storage location: {self.storage_path}",
+                )
                 self.use_vertex_ai = False
             else:
                 try:
                     self._initialize_vertex_ai(project_id, location, agent_engine_id)
                 except Exception as e:
-                    print("\n" + "=" * 70)
-                    print("⚠️  FAILED TO INITIALIZE VERTEX AI MEMORY BANK")
-                    print("=" * 70)
-                    print(f"   Error: {e}")
-                    print("   Falling back to file-based storage")
-                    print(f"   Storage location: {self.storage_path}")
-                    print("=" * 70 + "\n")
+                    _print_banner(
+                        "⚠️  FAILED TO INITIALIZE VERTEX AI MEMORY BANK",
+                        f"   Error: {e}",
+                        "   Falling back to file-based storage",
+                        f"   Storage location: {self.storage_path}",
+                    )
                     self.use_vertex_ai = False
         else:
             if not VERTEX_AI_AVAILABLE:
-                print("\n" + "=" * 70)
-                print("ℹ️  VERTEX AI NOT AVAILABLE")
-                print("=" * 70)
-                print("   google-adk package not installed or incompatible")
-                print("   Using file-based preference storage")
-                print(f"   Storage location: {self.storage_path}")
-                print("=" * 70 + "\n")
+                _print_banner(
+                    "ℹ️  VERTEX AI NOT AVAILABLE",
+                    "   google-adk package not installed or incompatible",
+                    "   Using file-based preference storage",
+                    f"   Storage location: {self.storage_path}",
+                )
 
     def _initialize_vertex_ai(self, project_id: str, location: str, agent_engine_id: str):
         """Initialize Vertex AI Memory Bank and Session services."""
-        print("\n" + "=" * 70)
-        print("🔗 INITIALIZING VERTEX AI MEMORY BANK")
-        print("=" * 70)
-        print(f"   Project: {project_id}")
-        print(f"   Location: {location}")
-        print(f"   User: {self.user_id}")
-
         # Create Memory Bank service
         self.memory_service = VertexAiMemoryBankService(
             project=project_id,
@@ -111,10 +149,19 @@ class PreferenceManager:
             agent_engine_id=agent_engine_id
         )
 
-        print("✅ Vertex AI Memory Bank connected successfully!")
-        print("   Storage: Cloud-based (Vertex AI)")
-        print("   Backup: Local file (data/preferences.json)")
-        print("=" * 70 + "\n")
+        # Shared Vertex AI client for direct memory generate/retrieve calls
+        self._vertex_client = get_vertex_client(project_id, location)
+        self._agent_engine_name = get_agent_engine_name(project_id, location, agent_engine_id)
+
+        _print_banner(
+            "🔗 INITIALIZING VERTEX AI MEMORY BANK",
+            f"   Project: {project_id}",
+            f"   Location: {location}",
+            f"   User: {self.user_id}",
+            "✅ Vertex AI Memory Bank connected successfully!",
+            "   Storage: Cloud-based (Vertex AI)",
+            "   Backup: Local file (data/preferences.json)",
+        )
 
     async def initialize_memory_bank(self):
         """
@@ -143,77 +190,145 @@ class PreferenceManager:
         """Load preferences from local file."""
         if self.storage_path.exists():
             try:
-                with open(self.storage_path, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
+                with open(self.storage_path, 'rb') as f:
+                    # Stream key/value pairs from large files instead of
+                    # reading the whole document into memory first
+                    if ijson is not None and os.fstat(f.fileno()).st_size > STREAMING_LOAD_THRESHOLD:
+                        return dict(ijson.kvitems(f, ''))
+                    return _json_loads(f.read())
+            except (*_JSON_ERRORS, IOError):
                 pass
         return {}
 
+    def _schedule_file_save(self):
+        """
+        Save preferences to file after FILE_SAVE_DELAY seconds.
+
+        A burst of changes within the delay is written once. The timer
+        thread is non-daemon, so a pending save still runs at exit.
+        """
+        with self._save_lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(FILE_SAVE_DELAY, self._save_preferences_to_file)
+                self._save_timer.start()
+
     def _save_preferences_to_file(self):
-        """Save preferences to local file (backup)."""
-        try:
-            with open(self.storage_path, 'w') as f:
-                json.dump(self.preferences, f, indent=2)
-        except IOError as e:
-            print(f"⚠️  Warning: Could not save to file: {e}")
+        """Save preferences to local file (backup) now, replacing any pending save."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+
+            # Serialize a snapshot once; skip the write if nothing changed since the last save
+            payload = _json_dumps(dict(self.preferences))
+            payload_hash = hash(payload)
+            if payload_hash == self._last_payload_hash:
+                return
+
+            # Write to a temp file and rename, so the backup is never half-written
+            tmp_path = self.storage_path.with_name(self.storage_path.name + '.tmp')
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.storage_path)
+                self._last_payload_hash = payload_hash
+            except IOError as e:
+                print(f"⚠️  Warning: Could not save to file: {e}")
+
+    async def _save_to_memory_bank(self, preference_key: str, preference_value: str) -> bool:
+        """
+        Save a preference to Vertex AI Memory Bank using direct memory generation.
+
+        The preference is queued and flushed together with any other pending
+        preferences, so a burst of saves costs one or two RPCs instead of one
+        per preference.
+
+        Returns:
+            False if the Memory Bank request failed, True otherwise
+            (including preferences that are skipped and never sent)
+        """
+        result = self._queue_for_memory_bank(preference_value)
+        if result is None:
+            return True
+        # Blocking SDK call, run in a thread to keep the event loop free.
+        # Once it returns our batch has been sent, by this flush or an earlier one
+        await asyncio.to_thread(self._flush_pending)
+        return result.result()
+
+    def _queue_for_memory_bank(self, preference_value: str) -> Optional[Future]:
+        """
+        Queue a preference for the next Memory Bank flush.
 
-    async def _save_to_memory_bank(self, preference_key: str, preference_value: str):
-        """Save a preference to Vertex AI Memory Bank using direct memory generation."""
+        Returns:
+            Future resolved with the flush's success flag, or None if skipped
+        """
         if not self.use_vertex_ai or not self.memory_service:
-            return
+            return None
 
         # Skip saving generic/useless preferences
         if "remember my clothing preferences" in preference_value.lower():
-            return
+            return None
+
+        result = Future()
+        with self._pending_lock:
+            self._pending_prefs.append((preference_value, result))
+        return result
+
+    def _flush_pending(self):
+        """Send all queued preferences to Memory Bank in a single generate call."""
+        # One flush at a time: preferences queued while a flush is in flight
+        # are picked up together by the next one
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending_prefs = self._pending_prefs, []
+
+            if pending:
+                ok = self._generate_memories([value for value, _ in pending])
+                for _, result in pending:
+                    result.set_result(ok)
+
+    def _generate_memories(self, pending: List[str]) -> bool:
+        """
+        Generate Memory Bank memories for a batch of preferences.
 
+        Returns:
+            True if the batch was saved, False if the request failed
+        """
         try:
-            print(f"   💾 Saving preference to Memory Bank...")
-
-            # Create a specific conversation for THIS preference only
-            # Make it very clear what the preference is
-            user_message = f"Please remember this about my clothing preferences: {preference_value}"
-            assistant_message = f"Got it! I'll remember that you {preference_value}. I'll use this when making outfit recommendations."
-
-            # Use Vertex AI client directly to generate memories
-            import vertexai
-
-            # Initialize Vertex AI client (sync with memory_service config)
-            client = vertexai.Client(
-                project=self.memory_service._project,
-                location=self.memory_service._location
-            )
-
-            # Get the agent engine resource name
-            agent_engine_name = f"projects/{self.memory_service._project}/locations/{self.memory_service._location}/reasoningEngines/{self.memory_service._agent_engine_id}"
-
-            # Create events with natural conversation
-            events = [
-                {
+            print(f"   💾 Saving {len(pending)} preference(s) to Memory Bank...")
+
+            # One clear user/model exchange per preference, all in one request
+            events = []
+            for preference_value in pending:
+                user_message = f"Please remember this about my clothing preferences: {preference_value}"
+                assistant_message = f"Got it! I'll remember that you {preference_value}. I'll use this when making outfit recommendations."
+                events.append({
                     "content": {
                         "role": "user",
                         "parts": [{"text": user_message}]
                     }
-                },
-                {
+                })
+                events.append({
                     "content": {
                         "role": "model",
                         "parts": [{"text": assistant_message}]
                     }
-                }
-            ]
+                })
 
             # Generate memories directly with explicit scope
-            client.agent_engines.memories.generate(
-                name=agent_engine_name,
+            self._vertex_client.agent_engines.memories.generate(
+                name=self._agent_engine_name,
                 direct_contents_source={"events": events},
                 scope={"user_id": self.user_id},
                 config={"wait_for_completion": True}
             )
 
-            print(f"   ✅ Preference saved to cloud")
+            print(f"   ✅ Preference(s) saved to cloud")
+            return True
 
         except Exception as e:
             print(f"   ⚠️  Warning: Could not save to Memory Bank: {e}")
+            return False
 
     def add_preference(self, key: str, value: str):
         """
@@ -232,23 +347,19 @@ class PreferenceManager:
         pref_id = f"pref_{len(self.preferences) + 1}" if key.startswith("pref_") else key
 
         # Store in memory
-        self.preferences[pref_id] = value
+        self._set_preference(pref_id, value)
 
-        # Save to file (synchronous backup)
-        self._save_preferences_to_file()
+        # Save to file (backup, debounced so bursts are written once)
+        self._schedule_file_save()
 
-        # Save to Vertex AI Memory Bank (async, best effort)
+        # Save to Vertex AI Memory Bank (background, best effort) so the
+        # caller doesn't wait on the network round-trip
         if self.use_vertex_ai:
-            import asyncio
             try:
-                # Try to get running loop, or create new one
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # Create task if loop is running
-                    asyncio.create_task(self._save_to_memory_bank(pref_id, value))
-                else:
-                    # Run in new loop if no loop running
-                    loop.run_until_complete(self._save_to_memory_bank(pref_id, value))
+                if self._queue_for_memory_bank(value) is not None:
+                    if self._bg_executor is None:
+                        self._bg_executor = ThreadPoolExecutor(max_workers=1)
+                    self._bg_executor.submit(self._flush_pending)
             except Exception as e:
                 print(f"⚠️  Could not sync to Memory Bank: {e}")
 
@@ -261,19 +372,29 @@ class PreferenceManager:
             value: Preference value
         """
         pref_id = f"pref_{len(self.preferences) + 1}" if key.startswith("pref_") else key
-        self.preferences[pref_id] = value
-        self._save_preferences_to_file()
+        self._set_preference(pref_id, value)
+        self._schedule_file_save()
 
         if self.use_vertex_ai:
             await self._save_to_memory_bank(pref_id, value)
 
-    def get_all_preferences(self) -> Dict[str, str]:
-        """Get all stored preferences."""
-        return self.preferences.copy()
+    def _set_preference(self, pref_id: str, value: str):
+        """Store a preference, keeping the value list in step with the dict."""
+        if pref_id in self.preferences:
+            # Overwrite keeps the key's position, so rebuild the list in dict order
+            self.preferences[pref_id] = value
+            self._pref_values = list(self.preferences.values())
+        else:
+            self.preferences[pref_id] = value
+            self._pref_values.append(value)
+
+    def get_all_preferences(self) -> Mapping[str, str]:
+        """Get all stored preferences as a read-only live view."""
+        return self._prefs_view
 
     def get_preference_list(self) -> List[str]:
-        """Get preferences as a list of values."""
-        return list(self.preferences.values())
+        """Get preferences as a list of values (shared; do not modify)."""
+        return self._pref_values
 
     def get_preference_source(self) -> str:
         """Get the source where preferences were loaded from."""
@@ -281,7 +402,8 @@ class PreferenceManager:
 
     def clear_preferences(self):
         """Clear all preferences."""
-        self.preferences = {}
+        self.preferences.clear()  # In place, so the read-only view stays valid
+        self._pref_values = []
         self._save_preferences_to_file()
 
     async def load_from_memory_bank(self) -> Dict[str, str]:
@@ -295,19 +417,9 @@ class PreferenceManager:
             return {}
 
         try:
-            # Use Vertex AI client directly to retrieve memories
-            import vertexai
-
-            client = vertexai.Client(
-                project=self.memory_service._project,
-                location=self.memory_service._location
-            )
-
-            agent_engine_name = f"projects/{self.memory_service._project}/locations/{self.memory_service._location}/reasoningEngines/{self.memory_service._agent_engine_id}"
-
             # Retrieve memories with exact scope match
-            search_results = client.agent_engines.memories.retrieve(
-                name=agent_engine_name,
+            search_results = self._vertex_client.agent_engines.memories.retrieve(
+                name=self._agent_engine_name,
                 scope={"user_id": self.user_id},
                 similarity_search_params={
                     "search_query": "clothing preferences outfit style"
@@ -329,7 +441,7 @@ class PreferenceManager:
 
                     # Extract preference from the fact
                     # The fact should contain information about preferences
-                    if fact_text and ('prefer' in fact_text.lower() or 'style' in fact_text.lower() or 'casual' in fact_text.lower() or 'formal' in fact_text.lower()):
+                    if fact_text and _PREF_KEYWORDS_RE.search(fact_text.lower()):
                         pref_key = f"pref_{len(loaded_prefs) + 1}"
                         loaded_prefs[pref_key] = fact_text
                 except (AttributeError, TypeError):
@@ -338,6 +450,7 @@ class PreferenceManager:
 
             if loaded_prefs:
                 self.preferences.update(loaded_prefs)
+                self._pref_values = list(self.preferences.values())
                 self._save_preferences_to_file()
 
             return loaded_prefs
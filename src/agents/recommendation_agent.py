@@ -6,17 +6,172 @@ intelligent, personalized outfit recommendations using AI.
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+import functools
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 
+try:
+    from ..utils.json_compat import _json_loads
+except ImportError:  # agents loaded as a top-level package (src/ on sys.path)
+    from utils.json_compat import _json_loads
+
 from google import genai
 from google.genai import types
 
-from .weather_agent import WeatherFetcher
-from .activity_agent import CalendarConnector, ActivityDetector
+from .weather_agent import WeatherFetcher, WeatherError
+from .activity_agent import CalendarConnector, ActivityDetector, CalendarEvent
 from .preference_agent import PreferenceManager
 
 
+# How long fetched weather stays fresh, in seconds
+WEATHER_CACHE_TTL = 600
+
+# Most (city, units) entries kept in the weather cache
+WEATHER_CACHE_SIZE = 256
+
+# Weather section of the recommendation context, filled from WeatherFetcher output
+_WEATHER_TMPL = (
+    "## Weather\n"
+    "- Location: {city}, {country}\n"
+    "- Temperature: {temperature}°{units}\n"
+    "- Feels like: {feels_like}°{units}\n"
+    "- Conditions: {conditions} ({description})\n"
+    "- Humidity: {humidity}%\n"
+    "- Wind: {wind_speed} m/s\n\n"
+)
+
+# Shared system prompt for single and batched recommendation requests
+_SYSTEM_INSTRUCTION = """
+You are an expert outfit recommendation assistant. Provide highly specific,
+contextual outfit suggestions that reference actual weather data, activities,
+and user preferences.
+
+CRITICAL REQUIREMENTS:
+1. ALWAYS mention the exact temperature and weather conditions in your opening
+2. ALWAYS reference specific user preferences when making recommendations
+3. ALWAYS explain WHY each item is recommended based on the context
+4. Be SPECIFIC - mention fabrics, colors, and practical details
+
+OUTPUT FORMAT:
+
+Opening line format: "For your [activity] in [temperature]°[C/F] [conditions] weather:"
+
+Then provide:
+- SPECIFIC clothing items (not generic categories)
+- For EACH item, explain WHY (reference weather, activity, or preference)
+- Accessories with reasoning
+- Practical considerations (sun exposure time, indoor/outdoor transitions, etc.)
+
+End with:
+"Reasoning: [Comprehensive explanation that ties together weather + activities + preferences]"
+
+EXAMPLE STYLE:
+"For your rooftop client lunch in 28°C sunny weather:
+
+- Light-colored button-down shirt (professional + reflects sun)
+- Dress pants or chinos (client meeting requires professional appearance)
+- Sunglasses (rooftop = 1.5 hours of direct sun exposure)
+- Skip the jacket outdoors, but bring light blazer (indoor AC afterward)
+- Consider: Breathable fabric since you'll be outside during peak heat
+
+Reasoning: Balancing professional appearance for client meeting with practical
+outdoor comfort. While you typically get cold easily, 28°C rooftop seating
+requires heat management. The blazer addresses your cold sensitivity for
+air-conditioned indoor spaces afterward."
+
+KEY PRINCIPLES:
+- Reference EXACT temperature and conditions
+- Quote or paraphrase user preferences when relevant
+- Explain time-based factors (duration outdoors, time of day)
+- Account for transitions (outdoor→indoor, sun→shade)
+- Be conversational but professional
+- Give specific fabric/color suggestions when relevant to weather
+"""
+
+# Preference extraction prompt used by chat(), filled with str.format(message=...)
+_EXTRACTION_PROMPT_TMPL = """
+Is this message expressing a clothing or weather preference?
+Message: "{message}"
+
+Respond with JSON:
+{{"is_preference": true/false, "preference": "extracted text or null"}}
+
+Examples:
+- "I prefer Celsius" → {{"is_preference": true, "preference": "prefers Celsius"}}
+- "I don't like shorts" → {{"is_preference": true, "preference": "dislikes shorts"}}
+- "What should I wear?" → {{"is_preference": false, "preference": null}}
+"""
+
+# Nouns that mark a liked/disliked object as an outfit preference: clothing,
+# fabrics and weather. Anything else ("I love Seattle", "I like dark roast
+# coffee") goes to the model, which decides whether it is a preference at all.
+_PREF_TOPIC_RE = re.compile(
+    r"\b(?:"
+    r"shirt|t-shirt|tee|blouse|sweater|jumper|hoodie|cardigan|jacket|coat|blazer|vest|"
+    r"suit|dress|skirt|pant|trouser|jean|shorts|legging|chino|sock|shoe|sneaker|boot|"
+    r"sandal|heel|loafer|hat|beanie|scarf|glove|mitten|sunglass|umbrella|raincoat|"
+    r"layer|layering|outfit|clothe|clothing|"
+    r"fabric|cotton|linen|wool|cashmere|denim|leather|silk|fleece|polyester|"
+    r"weather|rain|sunshine|snow|wind|celsius|fahrenheit"
+    r")(?:s|es)?\b",
+    re.I,
+)
+
+# Common preference phrasings resolved locally in chat(), without asking the model.
+# Each entry is (pattern, extract, needs_topic): the pattern must match the whole
+# message, and when needs_topic is set the captured object must also match
+# _PREF_TOPIC_RE before the preference text is saved.
+_PREF_PATTERNS = [
+    (re.compile(r"^\s*i\s+(?:really\s+)?(?:prefer|like|love)\s+(?!(?:to|it|this|that|you)\b)(?P<what>[^?]+?)[.!\s]*$", re.I),
+     lambda m: f"prefers {m['what']}", True),
+    (re.compile(r"^\s*i\s+(?:really\s+)?(?:don'?t\s+like|do\s+not\s+like|hate|dislike)\s+(?!(?:to|it|this|that|you)\b)(?P<what>[^?]+?)[.!\s]*$", re.I),
+     lambda m: f"dislikes {m['what']}", True),
+    (re.compile(r"^\s*i(?:'m|\s+am)\s+(?:always\s+|usually\s+|often\s+)?(?P<what>cold|hot|warm)[.!\s]*$", re.I),
+     lambda m: f"usually feels {m['what'].lower()}", False),
+    (re.compile(r"^\s*(?:please\s+)?use\s+(?P<what>celsius|fahrenheit)[.!\s]*$", re.I),
+     lambda m: f"prefers {m['what'].capitalize()}", False),
+]
+
+
+def _match_preference(message: str) -> Optional[str]:
+    """
+    Return the preference expressed by a common phrasing, or None.
+
+    None means the message should go through the model's preference
+    extraction, either because no phrasing matched or because the liked or
+    disliked object is not clothing-, fabric- or weather-related.
+    """
+    for pattern, extract, needs_topic in _PREF_PATTERNS:
+        m = pattern.match(message)
+        if m:
+            if needs_topic and not _PREF_TOPIC_RE.search(m['what']):
+                return None
+            return extract(m)
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _format_activity(i: int, title: str, start_time: str, location_type: str,
+                     formality: str, is_exercise: bool, is_outdoor: bool) -> str:
+    """Format one activity block of the recommendation context.
+
+    Cached because the same day's events are formatted again for every
+    recommendation (e.g. one per city in a batch).
+    """
+    exercise = "- Includes exercise\n" if is_exercise else ""
+    outdoor = "- Outdoor activity\n" if is_outdoor else ""
+    return (
+        f"\n### Activity {i}: {title}\n"
+        f"- Time: {start_time}\n"
+        f"- Type: {location_type}\n"
+        f"- Formality: {formality}\n"
+        f"{exercise}{outdoor}"
+    )
+
+
 class OutfitRecommendationAgent:
     """
     Main agent that orchestrates all data sources for outfit recommendations.
@@ -67,6 +222,8 @@ class OutfitRecommendationAgent:
 
         # Initialize data sources
         self.weather_fetcher = WeatherFetcher(weather_api_key)
+        # (city, units) -> (fetched_at, weather), oldest insertion first
+        self._weather_cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
 
         # Initialize preference manager with Vertex AI Memory Bank
         self.preference_manager = PreferenceManager(
@@ -83,6 +240,8 @@ class OutfitRecommendationAgent:
             # Use provided calendar connector or create new one
             self.calendar_connector = calendar_connector if calendar_connector else CalendarConnector()
             self.activity_detector = ActivityDetector()
+            # Serializes lazy authentication across concurrent recommendations
+            self._calendar_auth_lock = asyncio.Lock()
 
             # If we created a new connector, authenticate it
             if not calendar_connector:
@@ -121,18 +280,16 @@ class OutfitRecommendationAgent:
             - Sunglasses and sun protection
             ...
         """
-        # 1. Fetch weather data
-        weather = self.weather_fetcher.get_weather(location, units=temperature_unit)
-
-        if not weather['success']:
-            return f"Unable to fetch weather: {weather['error']}"
+        # 1-2. Fetch weather and calendar activities concurrently
+        try:
+            weather, events = await asyncio.gather(
+                self._fetch_weather(location, temperature_unit),
+                self._fetch_todays_events()
+            )
+        except WeatherError as e:
+            return f"Unable to fetch weather: {e.error_msg}"
 
-        # 2. Get calendar activities (if enabled)
-        activities = []
-        if self.use_calendar and self.calendar_connector:
-            if self.calendar_connector.authenticate():
-                events = self.calendar_connector.get_todays_events()
-                activities = [self.activity_detector.analyze_event(e) for e in events]
+        activities = self.activity_detector.analyze_events_batch(events) if events else []
 
         # 3. Get user preferences
         preferences = self.preference_manager.get_preference_list()
@@ -146,100 +303,134 @@ class OutfitRecommendationAgent:
 
         return recommendation
 
+    async def get_recommendations_batch(self, locations: List[str],
+                                        temperature_unit: str = "metric") -> List[str]:
+        """
+        Generate outfit recommendations for several locations at once.
+
+        Weather for every location is fetched concurrently, and all
+        recommendations are generated with a single AI request. If the
+        batched response cannot be parsed, falls back to one request per
+        location.
+
+        Args:
+            locations: City names (e.g., ["Tokyo", "London"])
+            temperature_unit: "metric" (Celsius) or "imperial" (Fahrenheit)
+
+        Returns:
+            Recommendation text for each location, in the same order
+        """
+        *weathers, events = await asyncio.gather(
+            *(self._fetch_weather_or_error(location, temperature_unit) for location in locations),
+            self._fetch_todays_events()
+        )
+
+        activities = self.activity_detector.analyze_events_batch(events) if events else []
+        preferences = self.preference_manager.get_preference_list()
+        pref_source = self.preference_manager.get_preference_source()
+
+        results = [f"Unable to fetch weather: {weather.error_msg}"
+                   if isinstance(weather, WeatherError) else None
+                   for weather in weathers]
+        pending = [i for i, result in enumerate(results) if result is None]
+        contexts = [self._build_context(weathers[i], activities, preferences, pref_source)
+                    for i in pending]
+
+        if contexts:
+            recommendations = await self._generate_batch_with_ai(contexts)
+            for i, recommendation in zip(pending, recommendations):
+                results[i] = recommendation
+
+        return results
+
+    async def _fetch_weather(self, location: str, temperature_unit: str) -> Dict[str, Any]:
+        """
+        Fetch weather for a location, reusing results younger than WEATHER_CACHE_TTL.
+
+        Only successful lookups are cached, so errors are retried next time.
+        The cache holds at most WEATHER_CACHE_SIZE entries; expired entries
+        are dropped when read and the oldest entry is evicted when full.
+
+        Raises:
+            WeatherError: If the weather lookup fails
+        """
+        key = (location.strip().lower(), temperature_unit)
+        cache = self._weather_cache
+        cached = cache.get(key)
+        if cached:
+            if time.monotonic() - cached[0] < WEATHER_CACHE_TTL:
+                return cached[1]
+            cache.pop(key, None)
+
+        weather = await asyncio.to_thread(
+            self.weather_fetcher.get_weather, location, units=temperature_unit
+        )
+        cache.pop(key, None)
+        cache[key] = (time.monotonic(), weather)
+        while len(cache) > WEATHER_CACHE_SIZE:
+            cache.popitem(last=False)
+
+        return weather
+
+    async def _fetch_weather_or_error(self, location: str,
+                                      temperature_unit: str) -> Union[Dict[str, Any], WeatherError]:
+        """Fetch weather, returning the WeatherError instead of raising it."""
+        try:
+            return await self._fetch_weather(location, temperature_unit)
+        except WeatherError as e:
+            return e
+
+    async def _fetch_todays_events(self) -> List[CalendarEvent]:
+        """Fetch today's calendar events, or an empty list if calendar is disabled."""
+        if not (self.use_calendar and self.calendar_connector):
+            return []
+
+        # Only authenticate once; the built service refreshes its own token
+        if not self.calendar_connector.service:
+            async with self._calendar_auth_lock:
+                # Another request may have authenticated while we waited
+                if not self.calendar_connector.service:
+                    if not await self.calendar_connector.authenticate_async():
+                        return []
+
+        return await self.calendar_connector.get_todays_events_async()
+
     def _build_context(self, weather: Dict, activities: List[Dict],
                       preferences: List[str], pref_source: str = "unknown") -> str:
         """Build context string for AI prompt."""
-        context = "# Outfit Recommendation Context\n\n"
+        parts = ["# Outfit Recommendation Context\n\n"]
 
         # Weather section
-        context += "## Weather\n"
-        context += f"- Location: {weather['city']}, {weather['country']}\n"
-        context += f"- Temperature: {weather['temperature']}°{weather['units']}\n"
-        context += f"- Feels like: {weather['feels_like']}°{weather['units']}\n"
-        context += f"- Conditions: {weather['conditions']} ({weather['description']})\n"
-        context += f"- Humidity: {weather['humidity']}%\n"
-        context += f"- Wind: {weather['wind_speed']} m/s\n\n"
+        parts.append(_WEATHER_TMPL.format_map(weather))
 
         # Activities section
         if activities:
-            context += "## Today's Activities\n"
-            for i, activity in enumerate(activities, 1):
-                context += f"\n### Activity {i}: {activity['title']}\n"
-                context += f"- Time: {activity['start_time']}\n"
-                context += f"- Type: {activity['location_type']}\n"
-                context += f"- Formality: {activity['formality']}\n"
-                if activity['is_exercise']:
-                    context += "- Includes exercise\n"
-                if activity['is_outdoor']:
-                    context += "- Outdoor activity\n"
-            context += "\n"
+            parts.append("## Today's Activities\n")
+            parts.extend(
+                _format_activity(i, activity['title'], activity['start_time'],
+                                 activity['location_type'], activity['formality'],
+                                 activity['is_exercise'], activity['is_outdoor'])
+                for i, activity in enumerate(activities, 1)
+            )
+            parts.append("\n")
         else:
-            context += "## Activities\n"
-            context += "- No specific activities scheduled\n\n"
+            parts.append("## Activities\n- No specific activities scheduled\n\n")
 
         # Preferences section
         if preferences:
             source_label = "☁️ Cloud (Vertex AI)" if pref_source == "vertex_ai_memory_bank" else "💾 Local File"
-            context += f"## User Preferences (Loaded from: {source_label})\n"
-            for pref in preferences:
-                context += f"- {pref}\n"
+            parts.append(f"## User Preferences (Loaded from: {source_label})\n")
+            parts.extend(f"- {pref}\n" for pref in preferences)
         else:
-            context += "## User Preferences\n"
-            context += "- No preferences set yet\n"
+            parts.append("## User Preferences\n- No preferences set yet\n")
 
-        return context
+        return "".join(parts)
 
     async def _generate_with_ai(self, context: str) -> str:
         """Generate recommendation using AI."""
-        system_instruction = """
-You are an expert outfit recommendation assistant. Provide highly specific,
-contextual outfit suggestions that reference actual weather data, activities,
-and user preferences.
-
-CRITICAL REQUIREMENTS:
-1. ALWAYS mention the exact temperature and weather conditions in your opening
-2. ALWAYS reference specific user preferences when making recommendations
-3. ALWAYS explain WHY each item is recommended based on the context
-4. Be SPECIFIC - mention fabrics, colors, and practical details
-
-OUTPUT FORMAT:
-
-Opening line format: "For your [activity] in [temperature]°[C/F] [conditions] weather:"
-
-Then provide:
-- SPECIFIC clothing items (not generic categories)
-- For EACH item, explain WHY (reference weather, activity, or preference)
-- Accessories with reasoning
-- Practical considerations (sun exposure time, indoor/outdoor transitions, etc.)
-
-End with:
-"Reasoning: [Comprehensive explanation that ties together weather + activities + preferences]"
-
-EXAMPLE STYLE:
-"For your rooftop client lunch in 28°C sunny weather:
-
-- Light-colored button-down shirt (professional + reflects sun)
-- Dress pants or chinos (client meeting requires professional appearance)
-- Sunglasses (rooftop = 1.5 hours of direct sun exposure)
-- Skip the jacket outdoors, but bring light blazer (indoor AC afterward)
-- Consider: Breathable fabric since you'll be outside during peak heat
-
-Reasoning: Balancing professional appearance for client meeting with practical
-outdoor comfort. While you typically get cold easily, 28°C rooftop seating
-requires heat management. The blazer addresses your cold sensitivity for
-air-conditioned indoor spaces afterward."
-
-KEY PRINCIPLES:
-- Reference EXACT temperature and conditions
-- Quote or paraphrase user preferences when relevant
-- Explain time-based factors (duration outdoors, time of day)
-- Account for transitions (outdoor→indoor, sun→shade)
-- Be conversational but professional
-- Give specific fabric/color suggestions when relevant to weather
-"""
 
         config = types.GenerateContentConfig(
-            system_instruction=system_instruction,
+            system_instruction=_SYSTEM_INSTRUCTION,
             temperature=0.7
         )
 
@@ -269,6 +460,48 @@ Remember to:
         except Exception as e:
             return f"Error generating recommendation: {str(e)}"
 
+    async def _generate_batch_with_ai(self, contexts: List[str]) -> List[str]:
+        """Generate one recommendation per context using a single AI request."""
+        if len(contexts) == 1:
+            return [await self._generate_with_ai(contexts[0])]
+
+        sections = "\n\n".join(
+            f"=== Location {i} ===\n{context}" for i, context in enumerate(contexts, 1)
+        )
+        prompt = f"""{sections}
+
+For EACH of the {len(contexts)} locations above, provide a detailed outfit
+recommendation following the usual format (opening line with exact temperature
+and conditions, specific items with explanations, accessories, and a closing
+"Reasoning:" paragraph).
+
+Respond with a JSON array of exactly {len(contexts)} strings, one recommendation
+per location, in the same order as the locations above."""
+
+        config = types.GenerateContentConfig(
+            system_instruction=_SYSTEM_INSTRUCTION,
+            temperature=0.7,
+            response_mime_type="application/json"
+        )
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=config
+            )
+            recommendations = _json_loads(response.text)
+            if (isinstance(recommendations, list) and len(recommendations) == len(contexts)
+                    and all(isinstance(r, str) for r in recommendations)):
+                return recommendations
+        except Exception:
+            pass
+
+        # Fall back to one request per location
+        return list(await asyncio.gather(
+            *(self._generate_with_ai(context) for context in contexts)
+        ))
+
     async def chat(self, message: str) -> str:
         """
         Chat with the agent to add preferences or ask questions.
@@ -286,38 +519,32 @@ Remember to:
             >>> print(response)
             Got it! I've saved: "prefers Celsius"
         """
-        # Try to extract preference
-        extraction_prompt = f"""
-Is this message expressing a clothing or weather preference?
-Message: "{message}"
-
-Respond with JSON:
-{{"is_preference": true/false, "preference": "extracted text or null"}}
-
-Examples:
-- "I prefer Celsius" → {{"is_preference": true, "preference": "prefers Celsius"}}
-- "I don't like shorts" → {{"is_preference": true, "preference": "dislikes shorts"}}
-- "What should I wear?" → {{"is_preference": false, "preference": null}}
-"""
-
         try:
-            config = types.GenerateContentConfig(
-                temperature=0.3,
-                response_mime_type="application/json"
-            )
-
-            response = await self.client.aio.models.generate_content(
-                model=self.model,
-                contents=extraction_prompt,
-                config=config
-            )
-
-            import json
-            result = json.loads(response.text)
+            # Common phrasings ("I prefer ...", "I don't like ...") are matched
+            # locally; only ask the model about anything else
+            pref = _match_preference(message)
+
+            if pref is None:
+                extraction_prompt = _EXTRACTION_PROMPT_TMPL.format(message=message)
+                config = types.GenerateContentConfig(
+                    temperature=0.3,
+                    response_mime_type="application/json"
+                )
+
+                response = await self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=extraction_prompt,
+                    config=config
+                )
+
+                # Parse only the outermost {...} in case the model wrapped the JSON in text
+                text = response.text
+                start, end = text.find('{'), text.rfind('}')
+                result = _json_loads(text[start:end + 1] if 0 <= start < end else text)
+                pref = result.get('preference') if result.get('is_preference') else None
 
             # Save preference if detected
-            if result.get('is_preference') and result.get('preference'):
-                pref = result['preference']
+            if pref:
                 await self.preference_manager.add_preference_async(f"pref_{len(self.preference_manager.preferences) + 1}", pref)
                 return f"✅ Saved preference: \"{pref}\"\nThis will be used in future recommendations."
 
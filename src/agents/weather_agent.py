@@ -5,8 +5,25 @@ Uses OpenWeatherMap API to get current weather conditions for outfit recommendat
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional
 
+try:
+    from ..utils.json_compat import _json_loads
+except ImportError:  # agents loaded as a top-level package (src/ on sys.path)
+    from utils.json_compat import _json_loads
+
+# Temperature symbol for each OpenWeatherMap units setting
+_UNIT_SYMBOLS = {'metric': 'C', 'imperial': 'F'}
+
+
+class WeatherError(Exception):
+    """Raised when weather data cannot be fetched for a city."""
+
+    def __init__(self, error_msg: str):
+        super().__init__(error_msg)
+        self.error_msg = error_msg
+
 
 class WeatherFetcher:
     """
@@ -25,6 +42,11 @@ class WeatherFetcher:
         self.api_key = api_key
         self.base_url = "https://api.openweathermap.org/data/2.5/weather"
 
+        # Reuse connections across requests (keep-alive avoids a TLS
+        # handshake per lookup); sized for concurrent multi-city fetches
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
     def get_weather(self, city: str, units: str = "metric") -> Dict[str, Any]:
         """
         Fetch current weather for a city.
@@ -34,7 +56,11 @@ class WeatherFetcher:
             units: "metric" for Celsius, "imperial" for Fahrenheit
 
         Returns:
-            Dictionary with weather data or error information
+            Dictionary with weather data
+
+        Raises:
+            WeatherError: If the city is unknown, the API key is invalid,
+                or the request fails
 
         Example:
             >>> fetcher = WeatherFetcher(api_key)
@@ -49,53 +75,42 @@ class WeatherFetcher:
         }
 
         try:
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = self._session.get(self.base_url, params=params, timeout=10)
 
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
+                main = data['main']
+                conditions = data['weather'][0]
+                wind = data['wind']
 
                 weather_info = {
-                    'success': True,
                     'city': data['name'],
                     'country': data['sys']['country'],
-                    'temperature': data['main']['temp'],
-                    'feels_like': data['main']['feels_like'],
-                    'conditions': data['weather'][0]['main'],
-                    'description': data['weather'][0]['description'],
-                    'humidity': data['main']['humidity'],
-                    'wind_speed': data['wind']['speed'],
-                    'wind_direction': data['wind']['deg'],
-                    'units': 'C' if units == 'metric' else 'F'
+                    'temperature': main['temp'],
+                    'feels_like': main['feels_like'],
+                    'conditions': conditions['main'],
+                    'description': conditions['description'],
+                    'humidity': main['humidity'],
+                    'wind_speed': wind['speed'],
+                    'wind_direction': wind['deg'],
+                    'units': _UNIT_SYMBOLS.get(units, 'F')
                 }
 
                 return weather_info
 
             elif response.status_code == 404:
-                return {
-                    'success': False,
-                    'error': f"City '{city}' not found"
-                }
+                raise WeatherError(f"City '{city}' not found")
             elif response.status_code == 401:
-                return {
-                    'success': False,
-                    'error': "Invalid API key"
-                }
+                raise WeatherError("Invalid API key")
             else:
-                return {
-                    'success': False,
-                    'error': f"API error: {response.status_code}"
-                }
+                raise WeatherError(f"API error: {response.status_code}")
 
-        except requests.Timeout:
-            return {
-                'success': False,
-                'error': "Request timed out"
-            }
+        except WeatherError:
+            raise
+        except requests.Timeout as e:
+            raise WeatherError("Request timed out") from e
         except Exception as e:
-            return {
-                'success': False,
-                'error': f"Unexpected error: {str(e)}"
-            }
+            raise WeatherError(f"Unexpected error: {str(e)}") from e
 
 
 def format_weather_message(weather_data: Dict[str, Any]) -> str:
@@ -103,13 +118,12 @@ def format_weather_message(weather_data: Dict[str, Any]) -> str:
     Format weather data into a readable message.
 
     Args:
-        weather_data: Dictionary with weather information
+        weather_data: Dictionary with weather information, as returned by
+            WeatherFetcher.get_weather
 
     Returns:
         Formatted string describing the weather
     """
-    if not weather_data['success']:
-        return f"Error: {weather_data['error']}"
 
     message = f"""
 Location: {weather_data['city']}, {weather_data['country']}
@@ -5,48 +5,144 @@ Loads environment variables and provides configuration to the application.
 Uses python-dotenv to load from .env file.
 """
 
+import functools
 import os
-from dotenv import load_dotenv
+import sys
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
+
+# Every entry point imports this module first; fail with a clear message
+# instead of a TypeError from dataclass(slots=True) below
+if sys.version_info < (3, 10):
+    raise RuntimeError(
+        f"WeatherItBetter requires Python 3.10 or higher "
+        f"(running {sys.version_info.major}.{sys.version_info.minor})"
+    )
 
 # Load environment variables from .env file in project root
 # Use explicit path to avoid loading .env from parent directories
-# override=True ensures .env file takes precedence over shell environment
 _project_root = Path(__file__).parent.parent
 _env_path = _project_root / '.env'
-load_dotenv(dotenv_path=_env_path, override=True)
 
+# Set in os.environ once .env has been loaded, so a second copy of this
+# module (e.g. imported as both 'config' and 'src.config') skips re-parsing
+_DOTENV_LOADED_FLAG = '_WIB_DOTENV_LOADED'
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env_once():
+    """Load the .env file into the process environment, at most once."""
+    if os.environ.get(_DOTENV_LOADED_FLAG):
+        return
+    from dotenv import load_dotenv
+
+    # override=True ensures .env file takes precedence over shell environment
+    load_dotenv(dotenv_path=_env_path, override=True)
+    os.environ[_DOTENV_LOADED_FLAG] = '1'
+
+
+def _to_bool(value: str) -> bool:
+    return value.lower() == 'true'
 
-class Config:
-    """Application configuration from environment variables."""
+
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """Typed, immutable application settings, parsed once from the environment."""
 
     # API Keys - REQUIRED
-    GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-    OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
+    GOOGLE_API_KEY: Optional[str]
+    OPENWEATHER_API_KEY: Optional[str]
 
     # Google Cloud - OPTIONAL (for advanced features)
-    GOOGLE_CLOUD_PROJECT = os.getenv('GOOGLE_CLOUD_PROJECT')
-    GOOGLE_CLOUD_LOCATION = os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
-    AGENT_ENGINE_ID = os.getenv('AGENT_ENGINE_ID')
+    GOOGLE_CLOUD_PROJECT: Optional[str]
+    GOOGLE_CLOUD_LOCATION: str
+    AGENT_ENGINE_ID: Optional[str]
 
     # Application Settings
-    DEFAULT_LOCATION = os.getenv('DEFAULT_LOCATION', 'New York, NY')
-    DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
-    DATA_DIR = Path(os.getenv('DATA_DIR', 'data'))
+    DEFAULT_LOCATION: str
+    DEBUG_MODE: bool
+    WIB_QUIET: bool  # Suppress decorative console banners
+    LOG_LEVEL: str
+    DATA_DIR: Path
 
     # AI Model Settings
-    AI_MODEL = os.getenv('AI_MODEL', 'gemini-2.0-flash-exp')
-    AGENT_TEMPERATURE = float(os.getenv('AGENT_TEMPERATURE', '0.7'))
-    AGENT_MAX_TOKENS = int(os.getenv('AGENT_MAX_TOKENS', '2000'))
+    AI_MODEL: str
+    AGENT_TEMPERATURE: float
+    AGENT_MAX_TOKENS: int
 
     # Session Settings
-    SESSION_TIMEOUT = int(os.getenv('SESSION_TIMEOUT', '24'))
-    ENABLE_METRICS = os.getenv('ENABLE_METRICS', 'true').lower() == 'true'
+    SESSION_TIMEOUT: int
+    ENABLE_METRICS: bool
 
     # Streamlit Settings
-    STREAMLIT_SERVER_PORT = int(os.getenv('STREAMLIT_SERVER_PORT', '8501'))
-    STREAMLIT_SERVER_ADDRESS = os.getenv('STREAMLIT_SERVER_ADDRESS', 'localhost')
+    STREAMLIT_SERVER_PORT: int
+    STREAMLIT_SERVER_ADDRESS: str
+
+    @classmethod
+    def from_env(cls) -> '_Config':
+        """Build settings from environment variables, applying defaults and types."""
+        getenv = os.getenv
+        return cls(
+            GOOGLE_API_KEY=getenv('GOOGLE_API_KEY'),
+            OPENWEATHER_API_KEY=getenv('OPENWEATHER_API_KEY'),
+            GOOGLE_CLOUD_PROJECT=getenv('GOOGLE_CLOUD_PROJECT'),
+            GOOGLE_CLOUD_LOCATION=getenv('GOOGLE_CLOUD_LOCATION', 'us-central1'),
+            AGENT_ENGINE_ID=getenv('AGENT_ENGINE_ID'),
+            DEFAULT_LOCATION=getenv('DEFAULT_LOCATION', 'New York, NY'),
+            DEBUG_MODE=_to_bool(getenv('DEBUG_MODE', 'false')),
+            WIB_QUIET=getenv('WIB_QUIET', '0') == '1',
+            LOG_LEVEL=getenv('LOG_LEVEL', 'INFO').upper(),
+            DATA_DIR=Path(getenv('DATA_DIR', 'data')),
+            AI_MODEL=getenv('AI_MODEL', 'gemini-2.0-flash-exp'),
+            AGENT_TEMPERATURE=float(getenv('AGENT_TEMPERATURE', '0.7')),
+            AGENT_MAX_TOKENS=int(getenv('AGENT_MAX_TOKENS', '2000')),
+            SESSION_TIMEOUT=int(getenv('SESSION_TIMEOUT', '24')),
+            ENABLE_METRICS=_to_bool(getenv('ENABLE_METRICS', 'true')),
+            STREAMLIT_SERVER_PORT=int(getenv('STREAMLIT_SERVER_PORT', '8501')),
+            STREAMLIT_SERVER_ADDRESS=getenv('STREAMLIT_SERVER_ADDRESS', 'localhost'),
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> _Config:
+    """
+    Get the application settings, loading .env and parsing them on first call.
+
+    Returns:
+        _Config: The shared, immutable settings instance
+    """
+    _load_env_once()
+    return _Config.from_env()
+
+
+@functools.lru_cache(maxsize=1)
+def _credentials_present() -> bool:
+    """Check once whether the Google Calendar credentials.json file exists."""
+    return Path('credentials.json').exists()
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_directory(path: Path):
+    """Create a directory (and parents) once per process."""
+    path.mkdir(parents=True, exist_ok=True)
+
+
+class _ConfigMeta(type):
+    """Forwards unknown class attributes (the settings) to get_config()."""
+
+    def __getattr__(cls, name):
+        return getattr(get_config(), name)
+
+
+class Config(metaclass=_ConfigMeta):
+    """
+    Application configuration from environment variables.
+
+    Settings such as Config.GOOGLE_API_KEY are read from get_config(), so
+    the environment is only parsed on first access. New code can call
+    get_config() directly.
+    """
 
     @classmethod
     def validate(cls) -> bool:
@@ -75,8 +171,9 @@ class Config:
             return False
 
         # Check for Google Calendar credentials file
-        credentials_path = Path('credentials.json')
-        if not credentials_path.exists():
+        if not _credentials_present():
+            # Don't remember a miss, so adding the file fixes the next check
+            _credentials_present.cache_clear()
             print("\n❌ Missing required file: credentials.json")
             print("\nGoogle Calendar integration requires OAuth credentials.")
             print("To set up:")
@@ -89,7 +186,12 @@ class Config:
 
         return True
 
+    @classmethod
+    def invalidate_credentials_cache(cls):
+        """Forget the cached credentials.json check (e.g. after the file is removed)."""
+        _credentials_present.cache_clear()
+
     @classmethod
     def ensure_data_directory(cls):
-        """Create data directory if it doesn't exist."""
-        cls.DATA_DIR.mkdir(parents=True, exist_ok=True)
+        """Create data directory if it doesn't exist (checked once per process)."""
+        _ensure_directory(cls.DATA_DIR)
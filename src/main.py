@@ -3,25 +3,63 @@ WeatherItBetter - Main Entry Point
 
 AI-powered outfit recommendation system that considers weather, calendar activities,
 and personal preferences to suggest what to wear.
+
+Run from the project root with: python -m src.main
 """
 
 import asyncio
-import sys
-from pathlib import Path
+import threading
+
+from .config import Config
+
+
+_RULE = "=" * 70
+
+# Console banners, each printed with a single write
+_STARTUP_BANNER = f"\n{_RULE}\n👔 WeatherItBetter - AI Outfit Recommendation Agent\n{_RULE}"
+_AUTH_BANNER = f"\n{_RULE}\n🔐 AUTHENTICATING USER\n{_RULE}"
+_COMMANDS_HELP = (
+    "\n✅ Agent initialized successfully!\n"
+    "\nCommands:\n"
+    "  recommend <city> - Get outfit recommendation\n"
+    "  pref <text>      - Add a preference\n"
+    "  quit             - Exit\n"
+)
+_RECOMMENDATION_TMPL = f"{_RULE}\n🎯 YOUR OUTFIT RECOMMENDATION\n{_RULE}\n\n{{}}\n\n{_RULE}"
+
+
+async def _ainput(prompt: str) -> str:
+    """
+    Read a line from stdin without blocking the event loop.
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent))
+    input() runs in a daemon thread, so background tasks keep running while
+    the user types and a pending read never holds up interpreter exit.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
 
-from config import Config
-from agents.recommendation_agent import OutfitRecommendationAgent
-from agents.activity_agent import CalendarConnector
+    def _resolve(setter, value):
+        if not future.done():
+            setter(value)
+
+    def _read():
+        try:
+            line = input(prompt)
+        except BaseException as e:  # EOFError / KeyboardInterrupt go to the caller
+            loop.call_soon_threadsafe(_resolve, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(_resolve, future.set_result, line)
+
+    threading.Thread(target=_read, daemon=True).start()
+    return await future
 
 
 async def main():
     """Main application entry point."""
-    print("\n" + "=" * 70)
-    print("👔 WeatherItBetter - AI Outfit Recommendation Agent")
-    print("=" * 70)
+    # Decorative banners can be silenced with WIB_QUIET=1 (unless debugging)
+    show_banners = Config.DEBUG_MODE or not Config.WIB_QUIET
+    if show_banners:
+        print(_STARTUP_BANNER)
 
     # Validate configuration
     if not Config.validate():
@@ -30,14 +68,18 @@ async def main():
     # Ensure data directory exists
     Config.ensure_data_directory()
 
+    # Imported only after validation, so a misconfigured first run exits
+    # without loading the Google client libraries
+    from .agents.recommendation_agent import OutfitRecommendationAgent
+    from .agents.activity_agent import CalendarConnector
+
     try:
         # Step 1: Authenticate with Google Calendar to get user identity
-        print("\n" + "=" * 70)
-        print("🔐 AUTHENTICATING USER")
-        print("=" * 70)
+        if show_banners:
+            print(_AUTH_BANNER)
 
         calendar_connector = CalendarConnector()
-        if not calendar_connector.authenticate():
+        if not await calendar_connector.authenticate_async():
             print("\n❌ Failed to authenticate with Google Calendar")
             print("Please check your credentials.json file\n")
             return
@@ -46,7 +88,8 @@ async def main():
         user_email = calendar_connector.get_user_email()
         user_id = user_email if user_email else "default_user"
 
-        print("=" * 70 + "\n")
+        if show_banners:
+            print(_RULE + "\n")
 
         # Step 2: Initialize agent with authenticated user ID
         agent = OutfitRecommendationAgent(
@@ -63,17 +106,12 @@ async def main():
         # Step 3: Initialize async components (load preferences from Memory Bank)
         await agent.initialize()
 
-        print("\n✅ Agent initialized successfully!")
-        print("\nCommands:")
-        print("  recommend <city> - Get outfit recommendation")
-        print("  pref <text>      - Add a preference")
-        print("  quit             - Exit")
-        print()
+        print(_COMMANDS_HELP)
 
         # Interactive loop
         while True:
             try:
-                user_input = input("You: ").strip()
+                user_input = (await _ainput("You: ")).strip()
 
                 if not user_input:
                     continue
@@ -91,13 +129,7 @@ async def main():
                     print("\n🔄 Generating recommendation...\n")
                     recommendation = await agent.get_recommendation(city)
 
-                    print("=" * 70)
-                    print("🎯 YOUR OUTFIT RECOMMENDATION")
-                    print("=" * 70)
-                    print()
-                    print(recommendation)
-                    print()
-                    print("=" * 70)
+                    print(_RECOMMENDATION_TMPL.format(recommendation))
 
                 elif user_input.lower().startswith('pref '):
                     pref_text = user_input[5:].strip()
@@ -113,7 +145,7 @@ async def main():
                     response = await agent.chat(user_input)
                     print(f"\n🤖 {response}\n")
 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print("\n\n👋 Goodbye!\n")
                 break
             except Exception as e:
@@ -126,5 +158,13 @@ async def main():
         print(f"\n❌ Unexpected Error: {e}\n")
 
 
+def cli():
+    """Console entry point: run the interactive agent until the user exits."""
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n\n👋 Goodbye!\n")
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    cli()
@@ -0,0 +1,23 @@
+"""
+JSON Helpers
+
+Uses orjson for faster JSON (de)serialization when it is installed, and the
+standard library json module otherwise.
+"""
+
+import json
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> bytes:
+        """Serialize obj as indented JSON (non-string keys allowed)."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        """Serialize obj as indented JSON (non-string keys allowed)."""
+        return json.dumps(obj, indent=2).encode()
@@ -7,112 +7,171 @@ Provides multiple methods for detecting user location:
 3. Browser geolocation (future enhancement with JavaScript component)
 """
 
-import requests
+import asyncio
+import functools
+import re
+import time
+from collections import deque
+from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 import logging
 
+from .json_compat import _json_loads
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long an IP-based location stays fresh, in seconds
+IP_LOCATION_CACHE_TTL = 3600
+
+# Unified location field -> response key, per IP geolocation service
+_IPAPI_MAP = {
+    'city': 'city',
+    'region': 'region',
+    'region_code': 'region_code',
+    'country': 'country_name',
+    'country_code': 'country_code',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'timezone': 'timezone',
+    'postal': 'postal',
+}
+_IP_API_MAP = {
+    'city': 'city',
+    'region': 'regionName',
+    'region_code': 'region',
+    'country': 'country',
+    'country_code': 'countryCode',
+    'latitude': 'lat',
+    'longitude': 'lon',
+    'timezone': 'timezone',
+    'postal': 'zip',
+}
+
+# Value used when a service omits a field (anything not listed defaults to '')
+_FIELD_DEFAULTS = {'city': 'Unknown', 'latitude': None, 'longitude': None}
+
+# Any Unicode letter (word character that is not a digit or underscore)
+_HAS_ALPHA = re.compile(r"[^\W\d_]")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_session():
+    """
+    Get the shared HTTP session for IP lookups, created on first use.
+
+    Keeps connections alive across the primary -> alternative fallback and
+    retries a failed connection once before giving up. Read timeouts are not
+    retried, so a slow service costs at most one timeout.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers['User-Agent'] = 'WeatherItBetter'
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4,
+                          max_retries=Retry(connect=1, read=0, backoff_factor=0.2))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 
 class LocationDetector:
     """Enhanced location detection with multiple fallback options."""
 
+    # Successful IP lookups per method, shared by all detectors:
+    # method -> (monotonic timestamp, location data)
+    _ip_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
     def __init__(self):
         self.last_location = None
-        self.detection_history = []
+        self.detection_history = deque(maxlen=50)  # Keep only last 50 entries
 
-    def get_ip_location(self) -> Optional[Dict[str, Any]]:
+    def _cached_ip_location(self, method: str,
+                            record_result: bool = True) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached IP location for a method, or None."""
+        cached = self._ip_cache.get(method)
+        if cached is None or time.monotonic() - cached[0] >= IP_LOCATION_CACHE_TTL:
+            return None
+
+        location_data = dict(cached[1])
+        if record_result:
+            self._remember_location(method, location_data)
+        return location_data
+
+    def get_ip_location(self, record_result: bool = True) -> Optional[Dict[str, Any]]:
         """
         Get location based on IP address using ipapi.co API.
 
+        Args:
+            record_result: Store a success as last_location and log the
+                outcome to the detection history (successes are cached either way)
+
         Returns:
             Dictionary with location data or None if detection fails
         """
+        cached = self._cached_ip_location('ip', record_result)
+        if cached:
+            return cached
+
+        # Imported here so manual entry and validation don't pay for requests
+        import requests
+
         try:
-            response = requests.get('https://ipapi.co/json/', timeout=5)
+            response = _get_session().get('https://ipapi.co/json/', timeout=5)
             if response.status_code == 200:
-                data = response.json()
-
-                location_data = {
-                    'city': data.get('city', 'Unknown'),
-                    'region': data.get('region', ''),
-                    'region_code': data.get('region_code', ''),
-                    'country': data.get('country_name', ''),
-                    'country_code': data.get('country_code', ''),
-                    'latitude': data.get('latitude'),
-                    'longitude': data.get('longitude'),
-                    'timezone': data.get('timezone', ''),
-                    'postal': data.get('postal', ''),
-                    'location_string': self._format_location_string(
-                        data.get('city', 'Unknown'),
-                        data.get('region', ''),
-                        data.get('country_code', '')
-                    ),
-                    'method': 'IP-based',
-                    'accuracy': 'city',
-                    'raw_data': data
-                }
-
-                self.last_location = location_data
-                self._log_detection('ip', True, location_data)
+                data = _json_loads(response.content)
 
+                location_data = self._record_success(
+                    'ip', self._build_location(data, _IPAPI_MAP, 'IP-based'), record_result
+                )
                 logger.info(f"IP-based location detected: {location_data['location_string']}")
                 return location_data
 
             else:
                 logger.warning(f"IP location API returned status code: {response.status_code}")
-                self._log_detection('ip', False, {'status_code': response.status_code})
+                self._record_failure('ip', {'status_code': response.status_code}, record_result)
                 return None
 
         except requests.Timeout:
             logger.error("IP location detection timed out")
-            self._log_detection('ip', False, {'error': 'timeout'})
+            self._record_failure('ip', {'error': 'timeout'}, record_result)
             return None
         except requests.RequestException as e:
             logger.error(f"IP location detection failed: {e}")
-            self._log_detection('ip', False, {'error': str(e)})
+            self._record_failure('ip', {'error': str(e)}, record_result)
             return None
         except Exception as e:
             logger.error(f"Unexpected error in IP location detection: {e}")
-            self._log_detection('ip', False, {'error': str(e)})
+            self._record_failure('ip', {'error': str(e)}, record_result)
             return None
 
-    def get_ip_location_alternative(self) -> Optional[Dict[str, Any]]:
+    def get_ip_location_alternative(self, record_result: bool = True) -> Optional[Dict[str, Any]]:
         """
         Alternative IP-based location detection using ip-api.com.
 
         Fallback option if ipapi.co fails.
+
+        Args:
+            record_result: Store a success as last_location and log the
+                outcome to the detection history (successes are cached either way)
         """
+        cached = self._cached_ip_location('ip_alternative', record_result)
+        if cached:
+            return cached
+
         try:
-            response = requests.get('http://ip-api.com/json/', timeout=5)
+            response = _get_session().get('http://ip-api.com/json/', timeout=5)
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
 
                 if data.get('status') == 'success':
-                    location_data = {
-                        'city': data.get('city', 'Unknown'),
-                        'region': data.get('regionName', ''),
-                        'region_code': data.get('region', ''),
-                        'country': data.get('country', ''),
-                        'country_code': data.get('countryCode', ''),
-                        'latitude': data.get('lat'),
-                        'longitude': data.get('lon'),
-                        'timezone': data.get('timezone', ''),
-                        'postal': data.get('zip', ''),
-                        'location_string': self._format_location_string(
-                            data.get('city', 'Unknown'),
-                            data.get('regionName', ''),
-                            data.get('countryCode', '')
-                        ),
-                        'method': 'IP-based (alternative)',
-                        'accuracy': 'city',
-                        'raw_data': data
-                    }
-
-                    self.last_location = location_data
-                    self._log_detection('ip_alternative', True, location_data)
-
+                    location_data = self._record_success(
+                        'ip_alternative',
+                        self._build_location(data, _IP_API_MAP, 'IP-based (alternative)'),
+                        record_result
+                    )
                     logger.info(f"Alternative IP location detected: {location_data['location_string']}")
                     return location_data
 
@@ -120,9 +179,52 @@ class LocationDetector:
 
         except Exception as e:
             logger.error(f"Alternative IP location detection failed: {e}")
-            self._log_detection('ip_alternative', False, {'error': str(e)})
+            self._record_failure('ip_alternative', {'error': str(e)}, record_result)
             return None
 
+    def _build_location(self, data: Dict[str, Any], key_map: Dict[str, str],
+                        method: str) -> Dict[str, Any]:
+        """
+        Build location data from an IP geolocation response.
+
+        Args:
+            data: Parsed JSON response
+            key_map: Unified field name -> response key for the service
+            method: Detection method label stored in the result
+
+        Returns:
+            Dictionary with location data
+        """
+        location_data = {
+            field: data.get(key, _FIELD_DEFAULTS.get(field, ''))
+            for field, key in key_map.items()
+        }
+        location_data['location_string'] = self._format_location_string(
+            location_data['city'], location_data['region'], location_data['country_code']
+        )
+        location_data['method'] = method
+        location_data['accuracy'] = 'city'
+        location_data['raw_data'] = data
+        return location_data
+
+    def _record_success(self, method: str, location_data: Dict[str, Any],
+                        record_result: bool = True) -> Dict[str, Any]:
+        """Cache a successful IP lookup, optionally remember it, and return it."""
+        self._ip_cache[method] = (time.monotonic(), location_data)
+        if record_result:
+            self._remember_location(method, location_data)
+        return location_data
+
+    def _record_failure(self, method: str, data: Dict[str, Any], record_result: bool = True):
+        """Log a failed IP lookup to the detection history, unless told not to."""
+        if record_result:
+            self._log_detection(method, False, data)
+
+    def _remember_location(self, method: str, location_data: Dict[str, Any]):
+        """Make a successful detection the last location and log it to the history."""
+        self.last_location = location_data
+        self._log_detection(method, True, location_data)
+
     def create_manual_location(self, location_string: str) -> Dict[str, Any]:
         """
         Create location data from manual entry.
@@ -133,12 +235,11 @@ class LocationDetector:
         Returns:
             Dictionary with location data
         """
-        # Parse the location string
-        parts = [part.strip() for part in location_string.split(',')]
-
-        city = parts[0] if len(parts) > 0 else location_string
-        region = parts[1] if len(parts) > 1 else ''
-        country = parts[2] if len(parts) > 2 else ''
+        # Parse "city, region, country" (anything after a third comma is ignored)
+        city, _, rest = location_string.partition(',')
+        region, _, rest = rest.partition(',')
+        country = rest.partition(',')[0]
+        city, region, country = city.strip(), region.strip(), country.strip()
 
         location_data = {
             'city': city,
@@ -184,6 +285,44 @@ class LocationDetector:
         logger.warning("All automatic location detection methods failed")
         return None
 
+    async def detect_location_auto_async(self) -> Optional[Dict[str, Any]]:
+        """
+        Automatically detect location, racing both IP services.
+
+        The primary and alternative lookups run concurrently in threads and
+        the first successful result wins, so a slow or failing service no
+        longer delays the other by up to its full timeout. Only the winning
+        result becomes last_location and enters the detection history; a
+        lookup still running when the race is decided cannot overwrite it.
+
+        Returns:
+            Dictionary with location data or None
+        """
+        logger.info("Starting automatic location detection (concurrent)...")
+
+        methods = {
+            asyncio.create_task(asyncio.to_thread(self.get_ip_location, record_result=False)): 'ip',
+            asyncio.create_task(
+                asyncio.to_thread(self.get_ip_location_alternative, record_result=False)
+            ): 'ip_alternative',
+        }
+        pending = set(methods)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    location = task.result()
+                    if location:
+                        self._remember_location(methods[task], location)
+                        return location
+        finally:
+            # The losing lookup's thread finishes on its own; just stop waiting for it
+            for task in pending:
+                task.cancel()
+
+        logger.warning("All automatic location detection methods failed")
+        return None
+
     def validate_location_string(self, location_string: str) -> Tuple[bool, str]:
         """
         Validate a location string for basic formatting.
@@ -194,7 +333,7 @@ class LocationDetector:
         Returns:
             Tuple of (is_valid, message)
         """
-        if not location_string or len(location_string.strip()) == 0:
+        if not location_string or location_string.isspace():
             return False, "Location cannot be empty"
 
         if len(location_string) < 2:
@@ -204,7 +343,7 @@ class LocationDetector:
             return False, "Location is too long"
 
         # Check for at least some alphabetic characters
-        if not any(c.isalpha() for c in location_string):
+        if _HAS_ALPHA.search(location_string) is None:
             return False, "Location must contain letters"
 
         return True, "Valid location format"
@@ -258,7 +397,10 @@ class LocationDetector:
             success: Whether detection succeeded
             data: Detection data or error info
         """
-        from datetime import datetime
+        # The full API response is only useful to the caller; don't keep up
+        # to 50 of them alive in the history
+        if 'raw_data' in data:
+            data = {key: value for key, value in data.items() if key != 'raw_data'}
 
         log_entry = {
             'timestamp': datetime.now().isoformat(),
@@ -269,10 +411,6 @@ class LocationDetector:
 
         self.detection_history.append(log_entry)
 
-        # Keep only last 50 entries
-        if len(self.detection_history) > 50:
-            self.detection_history = self.detection_history[-50:]
-
     def get_detection_stats(self) -> Dict[str, Any]:
         """
         Get statistics about location detection attempts.
@@ -287,19 +425,29 @@ class LocationDetector:
                 'methods_used': []
             }
 
-        total = len(self.detection_history)
-        successful = sum(1 for entry in self.detection_history if entry['success'])
-        methods = list(set(entry['method'] for entry in self.detection_history))
+        # Single pass over the history
+        total = successful = 0
+        methods = set()
+        for entry in self.detection_history:
+            total += 1
+            successful += entry['success']
+            methods.add(entry['method'])
 
         return {
             'total_attempts': total,
             'successful_attempts': successful,
             'success_rate': successful / total if total > 0 else 0,
-            'methods_used': methods,
+            'methods_used': list(methods),
             'last_location': self.last_location
         }
 
 
+@functools.lru_cache(maxsize=1)
+def _default_detector() -> LocationDetector:
+    """Get the detector shared by the convenience functions, created on first use."""
+    return LocationDetector()
+
+
 # Convenience functions for quick usage
 def detect_location() -> Optional[Dict[str, Any]]:
     """
@@ -308,8 +456,7 @@ def detect_location() -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary with location data or None
     """
-    detector = LocationDetector()
-    return detector.detect_location_auto()
+    return _default_detector().detect_location_auto()
 
 
 def create_location(location_string: str) -> Dict[str, Any]:
@@ -322,8 +469,7 @@ def create_location(location_string: str) -> Dict[str, Any]:
     Returns:
         Dictionary with location data
     """
-    detector = LocationDetector()
-    return detector.create_manual_location(location_string)
+    return _default_detector().create_manual_location(location_string)
 
 
 def validate_location(location_string: str) -> Tuple[bool, str]:
@@ -336,8 +482,7 @@ def validate_location(location_string: str) -> Tuple[bool, str]:
     Returns:
         Tuple of (is_valid, message)
     """
-    detector = LocationDetector()
-    return detector.validate_location_string(location_string)
+    return _default_detector().validate_location_string(location_string)
 
 
 if __name__ == "__main__":
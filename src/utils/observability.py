@@ -11,167 +11,352 @@ Features:
 - Configurable log levels
 """
 
+import atexit
+import functools
 import logging
+import logging.handlers
+import math
+import os
+import queue
+import re
 import time
-import uuid
-import json
+from collections import Counter, deque
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from contextlib import contextmanager
-from collections import defaultdict
+from contextvars import ContextVar, Token
 import threading
 
+from .json_compat import _json_dumps
+
 
 class TraceContext:
-    """Thread-local storage for trace IDs."""
-    _thread_local = threading.local()
+    """
+    Context-local storage for trace IDs.
+
+    Backed by a ContextVar, so the trace ID follows a request across awaits
+    and into the asyncio tasks it spawns, not just the current thread.
+    """
+    _trace_id: ContextVar[Optional[str]] = ContextVar('trace_id', default=None)
 
     @classmethod
-    def set_trace_id(cls, trace_id: str):
-        """Set the current trace ID."""
-        cls._thread_local.trace_id = trace_id
+    def set_trace_id(cls, trace_id: str) -> Token:
+        """
+        Set the current trace ID.
+
+        Returns:
+            Token to pass to clear_trace_id() to restore the previous ID
+        """
+        return cls._trace_id.set(trace_id)
 
     @classmethod
     def get_trace_id(cls) -> Optional[str]:
         """Get the current trace ID."""
-        return getattr(cls._thread_local, 'trace_id', None)
+        return cls._trace_id.get()
 
     @classmethod
-    def clear_trace_id(cls):
-        """Clear the current trace ID."""
-        if hasattr(cls._thread_local, 'trace_id'):
-            delattr(cls._thread_local, 'trace_id')
+    def clear_trace_id(cls, token: Optional[Token] = None):
+        """
+        Clear the current trace ID.
+
+        Args:
+            token: Token from set_trace_id(); restores the enclosing trace ID
+                instead of clearing it outright
+        """
+        if token is not None:
+            cls._trace_id.reset(token)
+        else:
+            cls._trace_id.set(None)
 
 
 class TraceIDFilter(logging.Filter):
     """Logging filter to add trace IDs to log records."""
 
+    def __init__(self, name: str = ''):
+        super().__init__(name)
+        # Runs for every record, so skip the class attribute lookups
+        self._get_trace_id = TraceContext._trace_id.get
+
     def filter(self, record):
         """Add trace_id to the log record."""
-        trace_id = TraceContext.get_trace_id()
-        record.trace_id = trace_id if trace_id else 'no-trace'
+        record.trace_id = self._get_trace_id() or 'no-trace'
         return True
 
 
-class MetricsCollector:
-    """Collects and stores metrics about agent operations."""
+class RunningStats:
+    """
+    Constant-memory response time statistics.
+
+    Tracks count, sum, min and max so each sample is O(1) to add and a
+    snapshot never scans the history.
+    """
 
     def __init__(self):
-        self.metrics = {
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """Add one sample."""
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+_METRICS_RULE = "=" * 60
+
+_METRICS_HEADER_TMPL = (
+    f"{_METRICS_RULE}\nAGENT METRICS\n{_METRICS_RULE}\n"
+    "Total Requests:       {total_requests}\n"
+    "Success Rate:         {success_rate:.1f}% ({successful_requests}/{total_requests})\n"
+    "Failed Requests:      {failed_requests}\n"
+    "\n"
+    "Response Times:\n"
+    "  Average:            {response_times[average]:.2f}s\n"
+    "  Min:                {response_times[min]:.2f}s\n"
+    "  Max:                {response_times[max]:.2f}s\n"
+    "  P95 (recent):       {response_times[recent_p95]:.2f}s\n"
+    "\n"
+    "API Calls:"
+)
+
+_METRICS_FOOTER_TMPL = "\n\nUptime Since:         {uptime_since}\n" + _METRICS_RULE
+
+
+def _format_counts(counts: Dict[str, int]) -> str:
+    """Render 'name  count' rows, each on its own line, for format_metrics."""
+    return "".join(f"\n  {name:20} {count}" for name, count in counts.items())
+
+
+class MetricsCollector:
+    """
+    Collects and stores metrics about agent operations.
+
+    The record_* methods are called on every traced operation and only put
+    an event on a SimpleQueue, so producers never contend with each other
+    or with the aggregates. record_request() goes one step further and
+    collects requests in a per-thread buffer, enqueuing them together every
+    REQUEST_BATCH_SIZE requests. A single daemon thread drains the queue
+    into plain ints, Counters and RunningStats under self.lock, taking the
+    lock once per batch of queued events. Snapshots and reset() first push
+    out every thread's buffer and wait for the resulting events to be
+    applied.
+
+    The most recent history_size response times are also kept in a ring
+    buffer (a deque with maxlen) for the recent p95. Memory stays bounded
+    no matter how long the process runs.
+    """
+
+    REQUEST_BATCH_SIZE = 64
+
+    def __init__(self, history_size: int = 4096):
+        """
+        Args:
+            history_size: Number of recent response times kept for percentiles
+        """
+        self.history_size = history_size
+        self.metrics = self._new_metrics()
+        self.lock = threading.Lock()
+        self._events = queue.SimpleQueue()
+        self._local = threading.local()
+        self._request_buffers: List[tuple] = []  # (thread, deque) pairs
+        self._request_buffers_lock = threading.Lock()
+        self._drainer = threading.Thread(
+            target=self._drain, name='metrics-drain', daemon=True
+        )
+        self._drainer.start()
+
+    def _new_metrics(self) -> Dict[str, Any]:
+        """Build an empty aggregate state."""
+        return {
             'total_requests': 0,
             'successful_requests': 0,
             'failed_requests': 0,
-            'response_times': [],
-            'api_calls': defaultdict(int),
-            'agent_calls': defaultdict(int),
-            'errors': defaultdict(int),
-            'start_time': datetime.now().isoformat()
+            'response_times': RunningStats(),
+            'recent_response_times': deque(maxlen=self.history_size),
+            'api_calls': Counter(),
+            'agent_calls': Counter(),
+            'errors': Counter(),
+            'start_ts': time.time()
         }
-        self.lock = threading.Lock()
+
+    def _drain(self):
+        """Apply queued events to the aggregates; runs on the drain thread."""
+        events = self._events
+        while True:
+            event = events.get()
+            with self.lock:
+                self._apply_logged(event)
+                # Fold in whatever else is already queued under the same lock
+                while True:
+                    try:
+                        event = events.get_nowait()
+                    except queue.Empty:
+                        break
+                    self._apply_logged(event)
+
+    def _apply_logged(self, event: tuple):
+        """Apply an event, logging failures so one bad event can't stop the drain thread."""
+        try:
+            self._apply(event)
+        except Exception:
+            _AGENT_LOGGER.exception("Dropped metrics event %r", event[0])
+
+    def _apply(self, event: tuple):
+        """Apply a single event. Caller holds self.lock."""
+        kind = event[0]
+        metrics = self.metrics
+        if kind == 'requests':
+            stats = metrics['response_times']
+            recent = metrics['recent_response_times']
+            for success, response_time in event[1]:
+                metrics['total_requests'] += 1
+                if success:
+                    metrics['successful_requests'] += 1
+                else:
+                    metrics['failed_requests'] += 1
+                stats.add(response_time)
+                recent.append(response_time)
+        elif kind == 'flush':
+            event[1].set()
+        else:
+            metrics[kind][event[1]] += 1
+
+    def _flush(self, timeout: float = 1.0):
+        """
+        Wait until every event recorded before this call has been applied.
+
+        Gives up after timeout seconds and logs a warning, in which case the
+        caller's snapshot may miss the most recent events.
+        """
+        self.flush_request_buffers()
+        applied = threading.Event()
+        self._events.put(('flush', applied))
+        if not applied.wait(timeout):
+            _AGENT_LOGGER.warning(
+                "Metrics drain did not catch up within %.1fs; snapshot may be stale", timeout
+            )
+
+    def _request_buffer(self) -> deque:
+        """The calling thread's pending-request buffer, registered on first use."""
+        try:
+            return self._local.requests
+        except AttributeError:
+            buffer = self._local.requests = deque()
+            with self._request_buffers_lock:
+                self._request_buffers.append((threading.current_thread(), buffer))
+            return buffer
+
+    def _enqueue_requests(self, buffer: deque):
+        """Move everything in a request buffer onto the event queue."""
+        # popleft is atomic, so the owning thread and a snapshot flushing
+        # the same buffer concurrently never take the same entry twice
+        batch = []
+        try:
+            while True:
+                batch.append(buffer.popleft())
+        except IndexError:
+            pass
+        if batch:
+            self._events.put(('requests', batch))
+
+    def flush_request_buffers(self):
+        """Enqueue the requests buffered by every thread."""
+        with self._request_buffers_lock:
+            buffers = self._request_buffers
+            self._request_buffers = [
+                (thread, buffer) for thread, buffer in buffers if thread.is_alive()
+            ]
+        for _, buffer in buffers:
+            self._enqueue_requests(buffer)
 
     def record_request(self, success: bool, response_time: float):
         """Record a completed request."""
-        with self.lock:
-            self.metrics['total_requests'] += 1
-            if success:
-                self.metrics['successful_requests'] += 1
-            else:
-                self.metrics['failed_requests'] += 1
-            self.metrics['response_times'].append(response_time)
+        buffer = self._request_buffer()
+        buffer.append((success, response_time))
+        if len(buffer) >= self.REQUEST_BATCH_SIZE:
+            self._enqueue_requests(buffer)
 
     def record_api_call(self, api_name: str):
         """Record an API call."""
-        with self.lock:
-            self.metrics['api_calls'][api_name] += 1
+        self._events.put(('api_calls', api_name))
 
     def record_agent_call(self, agent_name: str):
         """Record an agent execution."""
-        with self.lock:
-            self.metrics['agent_calls'][agent_name] += 1
+        self._events.put(('agent_calls', agent_name))
 
     def record_error(self, error_type: str):
         """Record an error occurrence."""
-        with self.lock:
-            self.metrics['errors'][error_type] += 1
+        self._events.put(('errors', error_type))
+
+    def _snapshot_locked(self) -> Dict[str, Any]:
+        """
+        Compute the metrics view. Caller holds self.lock.
+
+        The api_calls/agent_calls/errors entries are the live Counters, so
+        they must be copied or consumed before the lock is released.
+        """
+        metrics = self.metrics
+        rt = metrics['response_times']
+        recent = sorted(metrics['recent_response_times'])
+        total = metrics['total_requests']
+        successful = metrics['successful_requests']
+        start_ts = metrics['start_ts']
+
+        return {
+            'total_requests': total,
+            'successful_requests': successful,
+            'failed_requests': metrics['failed_requests'],
+            'success_rate': successful / total * 100 if total > 0 else 0,
+            'response_times': {
+                'count': rt.count,
+                'average': rt.total / rt.count if rt.count else 0,
+                'min': rt.min if rt.count else 0,
+                'max': rt.max if rt.count else 0,
+                # Nearest-rank p95 over the ring buffer, not all-time
+                'recent_p95': recent[math.ceil(len(recent) * 0.95) - 1] if recent else 0
+            },
+            'api_calls': metrics['api_calls'],
+            'agent_calls': metrics['agent_calls'],
+            'errors': metrics['errors'],
+            'uptime_since': datetime.fromtimestamp(start_ts).isoformat(),
+            'uptime_seconds': time.time() - start_ts
+        }
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics snapshot."""
+        self._flush()
         with self.lock:
-            response_times = self.metrics['response_times']
-
-            return {
-                'total_requests': self.metrics['total_requests'],
-                'successful_requests': self.metrics['successful_requests'],
-                'failed_requests': self.metrics['failed_requests'],
-                'success_rate': (
-                    self.metrics['successful_requests'] / self.metrics['total_requests'] * 100
-                    if self.metrics['total_requests'] > 0 else 0
-                ),
-                'response_times': {
-                    'count': len(response_times),
-                    'average': sum(response_times) / len(response_times) if response_times else 0,
-                    'min': min(response_times) if response_times else 0,
-                    'max': max(response_times) if response_times else 0
-                },
-                'api_calls': dict(self.metrics['api_calls']),
-                'agent_calls': dict(self.metrics['agent_calls']),
-                'errors': dict(self.metrics['errors']),
-                'uptime_since': self.metrics['start_time']
-            }
+            snapshot = self._snapshot_locked()
+            for key in ('api_calls', 'agent_calls', 'errors'):
+                snapshot[key] = dict(snapshot[key])
+        return snapshot
 
     def format_metrics(self) -> str:
         """Format metrics for display."""
-        metrics = self.get_metrics()
-
-        lines = [
-            "=" * 60,
-            "AGENT METRICS",
-            "=" * 60,
-            f"Total Requests:       {metrics['total_requests']}",
-            f"Success Rate:         {metrics['success_rate']:.1f}% ({metrics['successful_requests']}/{metrics['total_requests']})",
-            f"Failed Requests:      {metrics['failed_requests']}",
-            "",
-            "Response Times:",
-            f"  Average:            {metrics['response_times']['average']:.2f}s",
-            f"  Min:                {metrics['response_times']['min']:.2f}s",
-            f"  Max:                {metrics['response_times']['max']:.2f}s",
-            "",
-            "API Calls:",
-        ]
-
-        for api_name, count in metrics['api_calls'].items():
-            lines.append(f"  {api_name:20} {count}")
-
-        lines.append("")
-        lines.append("Agent Executions:")
-        for agent_name, count in metrics['agent_calls'].items():
-            lines.append(f"  {agent_name:20} {count}")
-
-        if metrics['errors']:
-            lines.append("")
-            lines.append("Errors:")
-            for error_type, count in metrics['errors'].items():
-                lines.append(f"  {error_type:20} {count}")
-
-        lines.append("")
-        lines.append(f"Uptime Since:         {metrics['uptime_since']}")
-        lines.append("=" * 60)
-
-        return "\n".join(lines)
+        self._flush()
+        # Rendered under the lock straight from the live Counters, no copies
+        with self.lock:
+            metrics = self._snapshot_locked()
+
+            text = _METRICS_HEADER_TMPL.format(**metrics)
+            text += _format_counts(metrics['api_calls'])
+            text += "\n\nAgent Executions:" + _format_counts(metrics['agent_calls'])
+            if metrics['errors']:
+                text += "\n\nErrors:" + _format_counts(metrics['errors'])
+            return text + _METRICS_FOOTER_TMPL.format(**metrics)
 
     def reset(self):
         """Reset all metrics."""
+        # Allocate outside the critical section; the lock only covers the swap
+        fresh = self._new_metrics()
+        self._flush()
         with self.lock:
-            self.metrics = {
-                'total_requests': 0,
-                'successful_requests': 0,
-                'failed_requests': 0,
-                'response_times': [],
-                'api_calls': defaultdict(int),
-                'agent_calls': defaultdict(int),
-                'errors': defaultdict(int),
-                'start_time': datetime.now().isoformat()
-            }
+            self.metrics = fresh
 
 
 # Global metrics collector instance
@@ -183,10 +368,69 @@ def get_metrics_collector() -> MetricsCollector:
     return _metrics_collector
 
 
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that writes through a 64 KiB buffer.
+
+    The stock handler flushes after every record, costing a write() syscall
+    each time. This one lets the buffer fill and only flushes for ERROR and
+    above, on flush(), or when the handler is closed.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=64 * 1024,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+# Resolved once; logging.getLogger() takes the logging module lock per call
+_AGENT_LOGGER = logging.getLogger('weather_outfit_agent')
+
+
+# Background thread that writes queued log records to the real handlers
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_log_listener():
+    """Drain queued log records, then close the handlers behind the queue."""
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    for handler in _log_listener.handlers:
+        target = getattr(handler, 'target', None)
+        handler.close()
+        if target is not None:
+            target.close()
+    _log_listener = None
+
+
+# Registered after the logging module's own shutdown hook, so it runs first
+atexit.register(_stop_log_listener)
+
+
 def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
     """
     Setup structured logging with trace ID support.
 
+    The logger's QueueHandler merges the message with its arguments on the
+    calling thread and enqueues the record. A QueueListener thread applies
+    the console/file formatters and writes the output, so logging calls
+    never block on console or file I/O.
+    File output is additionally batched through a MemoryHandler and a
+    buffered file stream, and flushed on ERROR or at exit.
+
     Args:
         level: Log level (DEBUG, INFO, WARNING, ERROR)
         log_file: Optional file path to write logs to
@@ -195,11 +439,12 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> loggin
         Configured logger instance
     """
     # Create logger
-    logger = logging.getLogger('weather_outfit_agent')
+    logger = _AGENT_LOGGER
     logger.setLevel(getattr(logging, level.upper()))
 
     # Remove existing handlers to avoid duplicates
     logger.handlers = []
+    _stop_log_listener()
 
     # Create formatter with trace ID
     formatter = logging.Formatter(
@@ -211,16 +456,29 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> loggin
     console_handler = logging.StreamHandler()
     console_handler.setLevel(getattr(logging, level.upper()))
     console_handler.setFormatter(formatter)
-    console_handler.addFilter(TraceIDFilter())
-    logger.addHandler(console_handler)
+    handlers: List[logging.Handler] = [console_handler]
 
     # File handler (optional)
     if log_file:
-        file_handler = logging.FileHandler(log_file)
+        file_handler = _BufferedFileHandler(log_file)
         file_handler.setLevel(logging.DEBUG)  # Always DEBUG for file
         file_handler.setFormatter(formatter)
-        file_handler.addFilter(TraceIDFilter())
-        logger.addHandler(file_handler)
+        handlers.append(logging.handlers.MemoryHandler(
+            capacity=1024, flushLevel=logging.ERROR, target=file_handler
+        ))
+
+    # The trace ID lives in a ContextVar, so it must be stamped on the
+    # record here in the caller's context, not on the listener thread
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(TraceIDFilter())
+    logger.addHandler(queue_handler)
+
+    global _log_listener
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _log_listener.start()
 
     return logger
 
@@ -235,8 +493,13 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
     Returns:
         Logger instance
     """
-    logger_name = f'weather_outfit_agent.{name}' if name else 'weather_outfit_agent'
-    return logging.getLogger(logger_name)
+    return _child_logger(name) if name else _AGENT_LOGGER
+
+
+@functools.lru_cache(maxsize=None)
+def _child_logger(name: str) -> logging.Logger:
+    """Resolve 'weather_outfit_agent.<name>' once per name."""
+    return _AGENT_LOGGER.getChild(name)
 
 
 @contextmanager
@@ -254,32 +517,38 @@ def trace_request(operation: str, **metadata):
         **metadata: Additional metadata to log
     """
     # Generate trace ID
-    trace_id = str(uuid.uuid4())[:8]
-    TraceContext.set_trace_id(trace_id)
+    trace_id = os.urandom(4).hex()
+    token = TraceContext.set_trace_id(trace_id)
 
-    logger = get_logger()
-    start_time = time.time()
+    logger = _AGENT_LOGGER
+    start_ns = time.monotonic_ns()
 
     # Log request start
-    metadata_str = ", ".join(f"{k}={v}" for k, v in metadata.items())
-    logger.info(f"→ START {operation} | {metadata_str}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("→ START %s | %s", operation, _format_metadata(metadata))
 
     success = False
+    error = None
     try:
         yield trace_id
         success = True
-        logger.info(f"✓ SUCCESS {operation} | Duration: {time.time() - start_time:.2f}s")
     except Exception as e:
-        logger.error(f"✗ FAILED {operation} | Error: {str(e)} | Duration: {time.time() - start_time:.2f}s")
-        get_metrics_collector().record_error(type(e).__name__)
+        error = e
         raise
     finally:
+        # Measured once and shared by the log line and the metrics
+        response_time = (time.monotonic_ns() - start_ns) / 1e9
+        if success:
+            logger.info("✓ SUCCESS %s | Duration: %.2fs", operation, response_time)
+        elif error is not None:
+            logger.error("✗ FAILED %s | Error: %s | Duration: %.2fs", operation, error, response_time)
+            get_metrics_collector().record_error(type(error).__name__)
+
         # Record metrics
-        response_time = time.time() - start_time
         get_metrics_collector().record_request(success, response_time)
 
         # Clear trace context
-        TraceContext.clear_trace_id()
+        TraceContext.clear_trace_id(token)
 
 
 @contextmanager
@@ -295,22 +564,22 @@ def trace_component(component_name: str, **metadata):
         component_name: Name of the component being traced
         **metadata: Additional metadata to log
     """
-    logger = get_logger()
-    start_time = time.time()
+    logger = _AGENT_LOGGER
+    start_ns = time.monotonic_ns()
 
-    metadata_str = ", ".join(f"{k}={v}" for k, v in metadata.items())
-    logger.info(f"  → {component_name} | {metadata_str}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("  → %s | %s", component_name, _format_metadata(metadata))
 
     try:
         yield
-        duration = time.time() - start_time
-        logger.debug(f"  ✓ {component_name} completed | Duration: {duration:.2f}s")
+        logger.debug("  ✓ %s completed | Duration: %.2fs", component_name,
+                     (time.monotonic_ns() - start_ns) / 1e9)
 
         # Record agent execution
         get_metrics_collector().record_agent_call(component_name)
     except Exception as e:
-        duration = time.time() - start_time
-        logger.error(f"  ✗ {component_name} failed | Error: {str(e)} | Duration: {duration:.2f}s")
+        logger.error("  ✗ %s failed | Error: %s | Duration: %.2fs", component_name, e,
+                     (time.monotonic_ns() - start_ns) / 1e9)
         raise
 
 
@@ -323,12 +592,12 @@ def log_api_call(api_name: str, endpoint: str, params: Dict[str, Any] = None):
         endpoint: API endpoint being called
         params: Optional parameters being sent
     """
-    logger = get_logger()
+    logger = _AGENT_LOGGER
 
-    # Mask sensitive data in params
-    safe_params = _mask_sensitive_data(params) if params else {}
-
-    logger.debug(f"  API Call: {api_name} → {endpoint} | Params: {safe_params}")
+    if logger.isEnabledFor(logging.DEBUG):
+        # Mask sensitive data in params
+        safe_params = _mask_sensitive_data(params) if params else {}
+        logger.debug("  API Call: %s → %s | Params: %s", api_name, endpoint, safe_params)
 
     # Record metric
     get_metrics_collector().record_api_call(api_name)
@@ -343,13 +612,14 @@ def log_decision(decision: str, reasoning: str, data: Dict[str, Any] = None):
         reasoning: Why this decision was made
         data: Optional supporting data
     """
-    logger = get_logger()
+    logger = _AGENT_LOGGER
 
-    logger.info(f"  DECISION: {decision}")
-    logger.debug(f"    Reasoning: {reasoning}")
+    logger.info("  DECISION: %s", decision)
 
-    if data:
-        logger.debug(f"    Data: {json.dumps(data, indent=2)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("    Reasoning: %s", reasoning)
+        if data:
+            logger.debug("    Data: %s", _json_dumps(data).decode())
 
 
 def log_data_flow(source: str, destination: str, data_type: str, summary: str = ""):
@@ -362,27 +632,31 @@ def log_data_flow(source: str, destination: str, data_type: str, summary: str =
         data_type: Type of data being passed
         summary: Optional summary of the data
     """
-    logger = get_logger()
+    logger = _AGENT_LOGGER
 
-    message = f"  DATA FLOW: {source} → {destination} | Type: {data_type}"
     if summary:
-        message += f" | {summary}"
+        logger.debug("  DATA FLOW: %s → %s | Type: %s | %s", source, destination, data_type, summary)
+    else:
+        logger.debug("  DATA FLOW: %s → %s | Type: %s", source, destination, data_type)
 
-    logger.debug(message)
 
+def _format_metadata(metadata: Dict[str, Any]) -> str:
+    """Render trace metadata as 'key=value, ...' for log lines."""
+    if not metadata:
+        return ""
+    return ", ".join(f"{k}={v}" for k, v in metadata.items())
 
-def _mask_sensitive_data(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Mask sensitive data like API keys in logs."""
-    sensitive_keys = {'api_key', 'apikey', 'token', 'password', 'secret'}
 
-    masked_data = {}
-    for key, value in data.items():
-        if any(sensitive in key.lower() for sensitive in sensitive_keys):
-            masked_data[key] = "***MASKED***"
-        else:
-            masked_data[key] = value
+# Parameter names whose values must never reach the logs
+_SENSITIVE_RE = re.compile(r'api[_-]?key|token|password|secret', re.IGNORECASE)
 
-    return masked_data
+
+def _mask_sensitive_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Mask sensitive data like API keys in logs."""
+    return {
+        key: "***MASKED***" if _SENSITIVE_RE.search(key) else value
+        for key, value in data.items()
+    }
 
 
 def display_metrics():
@@ -393,4 +667,4 @@ def display_metrics():
 def reset_metrics():
     """Reset all metrics."""
     get_metrics_collector().reset()
-    get_logger().info("Metrics have been reset")
+    _AGENT_LOGGER.info("Metrics have been reset")
@@ -0,0 +1,41 @@
+"""
+Vertex AI Client Utilities
+
+Provides a shared Vertex AI client so that scripts and agents reuse a single
+authenticated connection per project/location instead of rebuilding one
+(credential discovery + channel setup) for every call.
+"""
+
+import functools
+
+
+@functools.lru_cache(maxsize=4)
+def get_vertex_client(project: str, location: str):
+    """
+    Get a cached Vertex AI client for a project and location.
+
+    Args:
+        project: Google Cloud project number
+        location: GCP location (e.g., 'us-central1')
+
+    Returns:
+        vertexai.Client instance, shared by all callers with the same arguments
+    """
+    import vertexai
+
+    return vertexai.Client(project=project, location=location)
+
+
+def get_agent_engine_name(project: str, location: str, agent_engine_id: str) -> str:
+    """
+    Build the full resource name of an Agent Engine.
+
+    Args:
+        project: Google Cloud project number
+        location: GCP location (e.g., 'us-central1')
+        agent_engine_id: Numeric Agent Engine ID
+
+    Returns:
+        Resource name in the form projects/.../reasoningEngines/...
+    """
+    return f"projects/{project}/locations/{location}/reasoningEngines/{agent_engine_id}"
@@ -0,0 +1,63 @@
+"""
+Tests for ActivityDetector keyword classification.
+
+Run with: python -m unittest discover tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from agents.activity_agent import ActivityDetector
+
+
+def analyze(summary: str, location: str = '') -> dict:
+    return ActivityDetector.analyze_event({'summary': summary, 'location': location})
+
+
+class TestSummaryInflections(unittest.TestCase):
+    """Inflected summaries the original substring match classified."""
+
+    def test_running_club_is_exercise(self):
+        self.assertTrue(analyze('Running club')['is_exercise'])
+
+    def test_runs_and_workouts_are_exercise(self):
+        self.assertTrue(analyze('Morning run')['is_exercise'])
+        self.assertTrue(analyze('Evening workouts')['is_exercise'])
+
+    def test_workshop_is_business_casual(self):
+        self.assertEqual(analyze('Workshop')['formality'], 'business_casual')
+
+    def test_networking_is_business_casual(self):
+        self.assertEqual(analyze('Networking event')['formality'], 'business_casual')
+
+    def test_working_session_is_business_casual(self):
+        self.assertEqual(analyze('Working session')['formality'], 'business_casual')
+
+    def test_plural_meetings_are_formal(self):
+        self.assertEqual(analyze('Client meetings')['formality'], 'formal')
+
+
+class TestWholeWordMatching(unittest.TestCase):
+    """False positives removed by whole-word matching stay removed."""
+
+    def test_brunch_is_not_exercise(self):
+        self.assertFalse(analyze('Brunch')['is_exercise'])
+
+    def test_workout_is_not_business(self):
+        self.assertEqual(analyze('Workout')['formality'], 'casual')
+
+    def test_parking_location_is_not_outdoor(self):
+        result = analyze('Team lunch', 'Parking garage')
+        self.assertEqual(result['location_type'], 'indoor')
+        self.assertFalse(result['is_outdoor'])
+
+    def test_park_location_is_outdoor(self):
+        self.assertEqual(analyze('Picnic', 'Central Park')['location_type'], 'outdoor')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for the chat() preference fast path in the recommendation agent.
+
+Run with: python -m unittest discover tests
+"""
+
+import importlib
+import sys
+import types
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+
+def _stub_missing(name, **attrs):
+    """Register an empty stand-in module if the real one isn't installed."""
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        sys.modules[name] = module
+        parent, _, child = name.rpartition('.')
+        if parent:
+            setattr(sys.modules[parent], child, module)
+
+
+# The fast path is pure regex; stub the SDKs the module imports at load time
+_stub_missing('google')
+_stub_missing('google.genai')
+_stub_missing('google.genai.types')
+_stub_missing('requests')
+_stub_missing('requests.adapters', HTTPAdapter=object)
+
+from agents.recommendation_agent import _match_preference
+
+
+class TestMatchPreference(unittest.TestCase):
+
+    def test_clothing_preferences_are_matched(self):
+        self.assertEqual(_match_preference("I prefer layers"), "prefers layers")
+        self.assertEqual(_match_preference("I hate shorts"), "dislikes shorts")
+        self.assertEqual(_match_preference("I don't like wool sweaters."), "dislikes wool sweaters")
+
+    def test_weather_phrasings_are_matched(self):
+        self.assertEqual(_match_preference("I'm always cold"), "usually feels cold")
+        self.assertEqual(_match_preference("Use fahrenheit"), "prefers Fahrenheit")
+        self.assertEqual(_match_preference("I love the rain"), "prefers the rain")
+
+    def test_non_clothing_statements_fall_back_to_model(self):
+        self.assertIsNone(_match_preference("I love Seattle"))
+        self.assertIsNone(_match_preference("I like pizza"))
+        self.assertIsNone(_match_preference("I love my dog"))
+
+    def test_generic_adjectives_fall_back_to_model(self):
+        self.assertIsNone(_match_preference("I like dark roast coffee"))
+        self.assertIsNone(_match_preference("I love my smart phone"))
+        self.assertIsNone(_match_preference("I like light beer"))
+        self.assertIsNone(_match_preference("I hate the top floor"))
+
+    def test_dislike_of_pronouns_falls_back_to_model(self):
+        self.assertIsNone(_match_preference("I don't like it when my jacket is wet"))
+        self.assertIsNone(_match_preference("I hate that my shoes get muddy"))
+        self.assertIsNone(_match_preference("I dislike this coat"))
+
+    def test_questions_fall_back_to_model(self):
+        self.assertIsNone(_match_preference("What should I wear?"))
+
+
+if __name__ == '__main__':
+    unittest.main()